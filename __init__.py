@@ -1,13 +1,28 @@
 """
 QuantConnect Technical Analysis Trading Strategy
+
+Models are imported on first attribute access; only the NumPy-based indicators
+are needed to import the package outside a LEAN runtime.
 """
+import importlib
+
+_LAZY_IMPORTS = {
+    'TechnicalIndicatorAlphaModel': 'models.aplha_models.technical_alpha',
+    'PortfolioConstructionModel': 'models.portfolio_construction.PortfolioConstructionModel',
+    'IndicatorStrength': 'indicators.indicator_strength',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
-from models.aplha_models.technical_alpha import TechnicalIndicatorAlphaModel
-from models.portfolio_construction.portfolio_construction import PortfolioConstructionModel
-from .indicators.indicator_strength import IndicatorStrength
 
-__all__ = [
-    'TechnicalIndicatorAlphaModel',
-    'PortfolioConstructionModel',
-    'IndicatorStrength'
-] 
\ No newline at end of file
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,12 @@
+"""
+Local caches that avoid recomputing or refetching data across backtests
+"""
+
+from .feature_store import FeatureStore, FeatureTable
+from .history_cache import HistoryCache
+
+__all__ = [
+    'FeatureStore',
+    'FeatureTable',
+    'HistoryCache'
+]
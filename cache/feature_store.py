@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from indicators.signal_scoring import SCORED_PATTERNS, iter_features
+
+# Bump when compute_features changes so stale entries are not reused
+FEATURE_VERSION = 1
+
+BAR_FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+SCALAR_COLUMNS = (
+    'close', 'prev_close', 'close_10', 'min_5', 'max_5',
+    'upper_trendline', 'upper_trendline_prev', 'lower_trendline', 'lower_trendline_prev',
+    'support', 'resistance', 'short_ma', 'long_ma', 'volume_confidence'
+)
+# compute_features keeps the last 29 bar returns
+MAX_MARKET_RETURNS = 29
+# Rows are stored in chunks of one week of bar times, so overlapping date ranges share chunks
+CHUNK_SECONDS = 7 * 24 * 3600
+
+
+class FeatureTable:
+    """
+    Indicator outputs of one bar series, one row per scored bar.
+
+    Columns are numpy arrays, memory-mapped when loaded from a single FeatureStore chunk.
+    Row j belongs to the bar at index window - 1 + j of the input series.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns['time'])
+
+    @classmethod
+    def concatenate(cls, tables):
+        """Join the tables of consecutive row ranges"""
+        names = tables[0].columns.keys()
+        return cls({name: np.concatenate([table.columns[name] for table in tables]) for name in names})
+
+    def row(self, j):
+        """Return row j in the format of compute_features"""
+        values = {name: self.columns[name][j] for name in SCALAR_COLUMNS}
+        count = int(self.columns['market_returns_count'][j])
+        values['market_returns'] = list(self.columns['market_returns'][j, :count])
+        values['patterns'] = dict(zip(SCORED_PATTERNS, self.columns['patterns'][j].tolist()))
+        return values
+
+
+class FeatureStore:
+    """
+    On-disk store of indicator outputs, reused across backtests and parameter sweeps.
+
+    Rows are stored in chunks covering one week of bar times. Each chunk is keyed by a
+    content hash of the bars its rows are computed from (the chunk's bars plus the window
+    before them) and the indicator parameters, and written as one .npy file per column so
+    it can be memory-mapped. A backtest over a shifted or longer date range therefore only
+    computes the chunks it does not share with earlier runs. Sweeps over decision
+    parameters (signal thresholds, IndicatorStrength settings) only run the scoring stage
+    on the stored rows.
+    """
+
+    def __init__(self, directory):
+        """
+        Initialize the store
+
+        Parameters:
+        directory (str): Folder holding one sub-folder per entry
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(bars, window=200):
+        """Content hash of the bars and the indicator parameters
+
+        Parameters:
+        bars (dict): {field: array} with the fields in BAR_FIELDS, oldest bar first
+        window (int): Number of bars each row is computed from
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps({'version': FEATURE_VERSION, 'window': window}, sort_keys=True).encode())
+        for field in BAR_FIELDS:
+            digest.update(np.ascontiguousarray(bars[field], dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def get(self, bars, window=200):
+        """Load the feature table of a bar series, computing and storing it on first use
+
+        Parameters:
+        bars (dict): {field: array} with the fields in BAR_FIELDS, oldest bar first
+        window (int): Number of bars each row is computed from
+
+        Returns:
+        FeatureTable: Indicator outputs, one row per bar from index window - 1 on
+        """
+        times = np.asarray(bars['time'], dtype=np.float64)
+        if len(times) < window:
+            return FeatureTable(self.compute(bars, window))
+
+        chunk_ids = np.floor(times[window - 1:] / CHUNK_SECONDS)
+        starts = np.flatnonzero(np.concatenate(([True], chunk_ids[1:] != chunk_ids[:-1])))
+        ends = np.concatenate((starts[1:], [len(chunk_ids)]))
+
+        tables = []
+        for start, end in zip(starts, ends):
+            # Rows start..end-1 score bars window-1+start .. window-2+end, computed from bars start .. window-2+end
+            chunk = {field: np.asarray(bars[field])[start:window - 1 + end] for field in BAR_FIELDS}
+            path = os.path.join(self.directory, self.key(chunk, window))
+            if not os.path.isdir(path):
+                self._write(path, self.compute(chunk, window))
+            tables.append(self.load(path))
+        return tables[0] if len(tables) == 1 else FeatureTable.concatenate(tables)
+
+    @staticmethod
+    def compute(bars, window=200):
+        """Compute the feature columns of a bar series without touching the disk"""
+        rows = list(iter_features(bars['open'], bars['high'], bars['low'], bars['close'], bars['volume'], window))
+        n = len(rows)
+        columns = {'time': np.asarray(bars['time'], dtype=np.float64)[window - 1:window - 1 + n]}
+        for name in SCALAR_COLUMNS:
+            columns[name] = np.array([row[name] for row in rows], dtype=np.float64)
+
+        returns = np.full((n, MAX_MARKET_RETURNS), np.nan)
+        counts = np.zeros(n, dtype=np.int64)
+        patterns = np.zeros((n, len(SCORED_PATTERNS)), dtype=bool)
+        for j, row in enumerate(rows):
+            counts[j] = len(row['market_returns'])
+            returns[j, :counts[j]] = row['market_returns']
+            patterns[j] = [row['patterns'][name] for name in SCORED_PATTERNS]
+        columns['market_returns'] = returns
+        columns['market_returns_count'] = counts
+        columns['patterns'] = patterns
+        return columns
+
+    @staticmethod
+    def load(path):
+        """Memory-map a stored entry"""
+        columns = {}
+        for name in os.listdir(path):
+            if name.endswith('.npy'):
+                columns[name[:-4]] = np.load(os.path.join(path, name), mmap_mode='r')
+        return FeatureTable(columns)
+
+    def _write(self, path, columns):
+        # Write into a temporary folder and rename it, so readers never see a partial entry
+        temporary = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+        try:
+            for name, values in columns.items():
+                np.save(os.path.join(temporary, f"{name}.npy"), values)
+            os.rename(temporary, path)
+        except OSError:
+            # Another process stored the same entry first
+            if not os.path.isdir(path):
+                raise
+        finally:
+            if os.path.isdir(temporary):
+                shutil.rmtree(temporary)
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+class HistoryCache:
+    """
+    Local on-disk cache in front of algorithm.History.
+
+    One compressed columnar file (numpy .npz, one array per column) is kept per
+    (symbol, resolution) together with the time ranges it covers. Requests only fetch
+    the parts not covered yet and merge them in, so disjoint requests accumulate in one
+    file. Files are evicted least recently used first once the cache grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Parameters:
+        directory (str): Folder holding the cache files
+        max_bytes (int): Size limit of the folder before LRU eviction starts
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.fetches = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def history(self, algorithm, symbol, start, end, resolution):
+        """Return the history of one symbol, reading from disk where possible
+
+        Parameters:
+        algorithm (QCAlgorithm): Algorithm used to fetch missing data
+        symbol (Symbol): The asset symbol
+        start (datetime): Start of the requested range
+        end (datetime): End of the requested range
+        resolution (Resolution): Data resolution
+
+        Returns:
+        DataFrame: Bars indexed by (symbol, time), as returned by algorithm.History
+        """
+        path = self._path(symbol, resolution)
+        start_ns, end_ns = pd.Timestamp(start).value, pd.Timestamp(end).value
+        cached = self._load(path)
+        ranges = [] if cached is None else cached['ranges']
+        missing = self._missing(ranges, start_ns, end_ns)
+
+        if not missing:
+            self.hits += 1
+            os.utime(path)
+            data = cached
+        else:
+            pieces = [] if cached is None else [cached]
+            for gap_start, gap_end in missing:
+                pieces.append(self._fetch(algorithm, symbol, pd.Timestamp(gap_start).to_pydatetime(),
+                                          pd.Timestamp(gap_end).to_pydatetime(), resolution))
+            data = self._merge(pieces)
+            data['ranges'] = self._union(ranges + [(start_ns, end_ns)])
+            self._save(path, data)
+
+        return self._frame(symbol, data, start_ns, end_ns)
+
+    def _fetch(self, algorithm, symbol, start, end, resolution):
+        self.fetches += 1
+        history = algorithm.History([symbol], start, end, resolution)
+        if history is None or history.empty:
+            return {'time': np.zeros(0, dtype=np.int64), 'columns': {}}
+        history = history.select_dtypes(include=[np.number])
+        times = history.index.get_level_values(-1).values.astype('datetime64[ns]').astype(np.int64)
+        return {'time': times, 'columns': {name: history[name].to_numpy(dtype=float) for name in history.columns}}
+
+    @staticmethod
+    def _missing(ranges, start_ns, end_ns):
+        """Sub-ranges of [start_ns, end_ns] not covered by the sorted, disjoint cached ranges"""
+        missing = []
+        cursor = start_ns
+        for range_start, range_end in ranges:
+            if range_end < cursor:
+                continue
+            if range_start > end_ns:
+                break
+            if range_start > cursor:
+                missing.append((cursor, range_start))
+            cursor = max(cursor, range_end)
+        if cursor < end_ns or not ranges:
+            missing.append((cursor, end_ns))
+        return missing
+
+    @staticmethod
+    def _union(ranges):
+        merged = []
+        for range_start, range_end in sorted(ranges):
+            if merged and range_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_start, range_end))
+        return merged
+
+    @staticmethod
+    def _merge(pieces):
+        times = np.concatenate([piece['time'] for piece in pieces])
+        names = list(dict.fromkeys(name for piece in pieces for name in piece['columns']))
+        columns = {}
+        for name in names:
+            columns[name] = np.concatenate([piece['columns'].get(name, np.full(len(piece['time']), np.nan))
+                                            for piece in pieces])
+        # Sort by time and drop the bars fetched twice at the range boundaries, keeping the newest
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        keep = np.ones(len(times), dtype=bool)
+        keep[:-1] = times[1:] != times[:-1]
+        return {'time': times[keep], 'columns': {name: values[order][keep] for name, values in columns.items()}}
+
+    @staticmethod
+    def _frame(symbol, data, start_ns, end_ns):
+        times = data['time']
+        mask = (times >= start_ns) & (times <= end_ns)
+        index = pd.MultiIndex.from_arrays([[symbol] * int(mask.sum()), times[mask].astype('datetime64[ns]')],
+                                          names=['symbol', 'time'])
+        return pd.DataFrame({name: values[mask] for name, values in data['columns'].items()}, index=index)
+
+    def _path(self, symbol, resolution):
+        # str(Symbol) is only the ticker; the SecurityIdentifier also encodes market and security type
+        key = hashlib.sha1(f"{getattr(symbol, 'ID', symbol)}|{resolution}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.npz")
+
+    @staticmethod
+    def _load(path):
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as stored:
+            return {
+                'ranges': [(int(start), int(end)) for start, end in stored['__range__'].reshape(-1, 2)],
+                'time': stored['__time__'],
+                'columns': {key[4:]: stored[key] for key in stored.files if key.startswith('col_')}
+            }
+
+    def _save(self, path, data):
+        arrays = {f"col_{name}": values for name, values in data['columns'].items()}
+        arrays['__range__'] = np.array(data['ranges'], dtype=np.int64).reshape(-1, 2)
+        arrays['__time__'] = data['time']
+        # Write to a unique temporary file first so a crash never leaves a truncated cache file
+        # and concurrent backtests do not overwrite each other's partial writes
+        handle, temporary = tempfile.mkstemp(dir=self.directory, prefix='.tmp-', suffix='.part')
+        try:
+            with os.fdopen(handle, 'wb') as stream:
+                np.savez_compressed(stream, **arrays)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self._evict(keep=path)
+
+    def _evict(self, keep):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                file_path = os.path.join(self.directory, name)
+                stat = os.stat(file_path)
+                files.append((stat.st_mtime, stat.st_size, file_path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, file_path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if file_path == keep:
+                continue
+            os.remove(file_path)
+            total -= size
@@ -9,7 +9,15 @@ from .technical_indicators import (
     calculate_fibonacci_levels,
     calculate_volume_confidence
 )
-from .candlestick_patterns import detect_candlestick_patterns
+from .candlestick_patterns import detect_candlestick_patterns, detect_chart_patterns
+from .pattern_features import PatternFeatures, RollingExtreme
+from .signal_scoring import (
+    SignalScore,
+    compute_features,
+    iter_features,
+    score_features,
+    score_symbol
+)
 
 __all__ = [
     'IndicatorStrength',
@@ -17,5 +25,13 @@ __all__ = [
     'calculate_support_resistance',
     'calculate_fibonacci_levels',
     'calculate_volume_confidence',
-    'detect_candlestick_patterns'
+    'detect_candlestick_patterns',
+    'detect_chart_patterns',
+    'PatternFeatures',
+    'RollingExtreme',
+    'SignalScore',
+    'compute_features',
+    'iter_features',
+    'score_features',
+    'score_symbol'
 ] 
\ No newline at end of file
@@ -1,5 +1,12 @@
-def detect_candlestick_patterns(highs, lows, closes, opens):
-    """Detect various candlestick patterns"""
+from indicators.pattern_features import PatternFeatures
+
+
+def detect_candlestick_patterns(highs, lows, closes, opens, features=None):
+    """Detect various candlestick patterns
+
+    Chart patterns are checked against `features`, the PatternFeatures of the same bar
+    series kept up to date bar by bar; without it they are rebuilt from the last bars.
+    """
     patterns = {}
     
     # Single candlestick patterns
@@ -68,54 +75,61 @@ def detect_candlestick_patterns(highs, lows, closes, opens):
 
     # Chart Patterns (requires more historical data)
     if len(highs) >= 20:
-        # Head and Shoulders
-        left_shoulder = max(highs[-20:-15])
-        head = max(highs[-15:-10])
-        right_shoulder = max(highs[-10:-5])
-        if head > left_shoulder and head > right_shoulder and \
-           abs(left_shoulder - right_shoulder)/left_shoulder < 0.02:
-            patterns['head_and_shoulders'] = True
-
-        # Bull Flag
-        if all(highs[i] < highs[i-1] for i in range(-1, -6, -1)) and \
-           all(lows[i] < lows[i-1] for i in range(-1, -6, -1)):
-            patterns['bull_flag'] = True
-
-        # Ascending Triangle
-        resistance = max(highs[-20:])
-        if all(lows[i] > lows[i-1] for i in range(-1, -10, -1)) and \
-           all(abs(highs[i] - resistance) < 0.02 * resistance for i in range(-1, -10, -1)):
-            patterns['ascending_triangle'] = True
-
-        # Descending Triangle
-        support = min(lows[-20:])
-        if all(highs[i] < highs[i-1] for i in range(-1, -10, -1)) and \
-           all(abs(lows[i] - support) < 0.02 * support for i in range(-1, -10, -1)):
-            patterns['descending_triangle'] = True
-
-        # Rising Wedge
-        if all(highs[i] > highs[i-1] for i in range(-1, -10, -1)) and \
-           all(lows[i] > lows[i-1] for i in range(-1, -10, -1)):
-            patterns['rising_wedge'] = True
-
-        # Falling Wedge
-        if all(highs[i] < highs[i-1] for i in range(-1, -10, -1)) and \
-           all(lows[i] < lows[i-1] for i in range(-1, -10, -1)):
-            patterns['falling_wedge'] = True
-
-        # Cup and Handle
-        cup_bottom = min(lows[-20:-10])
-        if all(lows[i] > cup_bottom for i in range(-9, -1)):
-            patterns['cup_and_handle'] = True
-
-        # Megaphone
-        if all(highs[i] > highs[i-1] for i in range(-1, -10, -1)) and \
-           all(lows[i] < lows[i-1] for i in range(-1, -10, -1)):
-            patterns['megaphone'] = True
-
-        # Pennant
-        if all(highs[i] < highs[i-1] for i in range(-1, -10, -1)) and \
-           all(lows[i] > lows[i-1] for i in range(-1, -10, -1)):
-            patterns['pennant'] = True
-
-    return patterns 
\ No newline at end of file
+        if features is None:
+            features = PatternFeatures.from_arrays(highs, lows)
+        detect_chart_patterns(features, patterns)
+
+    return patterns
+
+
+def detect_chart_patterns(features, patterns=None):
+    """Detect chart patterns in constant time from incrementally maintained PatternFeatures"""
+    patterns = {} if patterns is None else patterns
+
+    # Head and Shoulders
+    left_shoulder = features.left_shoulder.value
+    head = features.head.value
+    right_shoulder = features.right_shoulder.value
+    if head > left_shoulder and head > right_shoulder and \
+       abs(left_shoulder - right_shoulder)/left_shoulder < 0.02:
+        patterns['head_and_shoulders'] = True
+
+    # Bull Flag
+    if features.falling_highs >= 5 and features.falling_lows >= 5:
+        patterns['bull_flag'] = True
+
+    # Ascending Triangle: last 9 highs all within 2% of the 20-bar resistance
+    resistance = features.resistance.value
+    if features.rising_lows >= 9 and \
+       max(abs(features.recent_high_max.value - resistance),
+           abs(features.recent_high_min.value - resistance)) < 0.02 * resistance:
+        patterns['ascending_triangle'] = True
+
+    # Descending Triangle: last 9 lows all within 2% of the 20-bar support
+    support = features.support.value
+    if features.falling_highs >= 9 and \
+       max(abs(features.recent_low_max.value - support),
+           abs(features.recent_low_min.value - support)) < 0.02 * support:
+        patterns['descending_triangle'] = True
+
+    # Rising Wedge
+    if features.rising_highs >= 9 and features.rising_lows >= 9:
+        patterns['rising_wedge'] = True
+
+    # Falling Wedge
+    if features.falling_highs >= 9 and features.falling_lows >= 9:
+        patterns['falling_wedge'] = True
+
+    # Cup and Handle
+    if features.handle_low.value > features.cup_bottom.value:
+        patterns['cup_and_handle'] = True
+
+    # Megaphone
+    if features.rising_highs >= 9 and features.falling_lows >= 9:
+        patterns['megaphone'] = True
+
+    # Pennant
+    if features.falling_highs >= 9 and features.rising_lows >= 9:
+        patterns['pennant'] = True
+
+    return patterns
@@ -5,7 +5,7 @@ from collections import defaultdict
 class IndicatorStrength:
     def __init__(self, lookback_period=30*24):  # 30 days * 24 hours for hourly data
         self.lookback_period = lookback_period
-        # Structure: {symbol: {indicator_name: IndicatorStats}}
+        # Structure: {symbol: {indicator_name: IndicatorStats}}; symbols may be interned integer ids
         self.asset_indicators = defaultdict(lambda: {})
         self.signals = []
         
@@ -0,0 +1,105 @@
+from collections import deque
+
+
+class RollingExtreme:
+    """
+    Maximum or minimum over a fixed window of bars that ends `lag` bars before the latest one.
+
+    Uses a monotonic deque, so each update is O(1) amortized whatever the window length.
+    """
+
+    def __init__(self, length, lag=0, maximum=True):
+        self.length = length
+        self.lag = lag
+        self.maximum = maximum
+        self.values = deque()  # (bar index, value), monotonic in value
+
+    def push(self, index, value):
+        """Add the value of bar `index` and drop bars that fell out of the window"""
+        if self.maximum:
+            while self.values and self.values[-1][1] <= value:
+                self.values.pop()
+        else:
+            while self.values and self.values[-1][1] >= value:
+                self.values.pop()
+        self.values.append((index, value))
+        while self.values[0][0] <= index - self.length:
+            self.values.popleft()
+
+    @property
+    def value(self):
+        return self.values[0][1]
+
+
+class PatternFeatures:
+    """
+    Per-symbol chart pattern features, updated once per bar.
+
+    Tracks runs of consecutive rising/falling highs and lows and the rolling window
+    extremes the chart patterns in detect_candlestick_patterns compare against, so each
+    pattern becomes a constant-time check.
+    """
+
+    # Number of bars the chart patterns look back
+    HISTORY = 20
+
+    def __init__(self):
+        self.count = 0
+        self.last_high = None
+        self.last_low = None
+        # Consecutive bars whose high/low was strictly above/below the previous one
+        self.rising_highs = 0
+        self.falling_highs = 0
+        self.rising_lows = 0
+        self.falling_lows = 0
+        self.highs = deque(maxlen=self.HISTORY)
+        self.lows = deque(maxlen=self.HISTORY)
+
+        # Head and shoulders: highs[-20:-15], highs[-15:-10], highs[-10:-5]
+        self.left_shoulder = RollingExtreme(5, lag=15)
+        self.head = RollingExtreme(5, lag=10)
+        self.right_shoulder = RollingExtreme(5, lag=5)
+        # Triangles: highs[-20:], lows[-20:] and the range of highs[-9:], lows[-9:]
+        self.resistance = RollingExtreme(20)
+        self.support = RollingExtreme(20, maximum=False)
+        self.recent_high_max = RollingExtreme(9)
+        self.recent_high_min = RollingExtreme(9, maximum=False)
+        self.recent_low_max = RollingExtreme(9)
+        self.recent_low_min = RollingExtreme(9, maximum=False)
+        # Cup and handle: lows[-20:-10] and lows[-9:-1]
+        self.cup_bottom = RollingExtreme(10, lag=10, maximum=False)
+        self.handle_low = RollingExtreme(8, lag=1, maximum=False)
+
+        self._high_extremes = [self.left_shoulder, self.head, self.right_shoulder, self.resistance,
+                               self.recent_high_max, self.recent_high_min]
+        self._low_extremes = [self.support, self.recent_low_max, self.recent_low_min,
+                              self.cup_bottom, self.handle_low]
+
+    @classmethod
+    def from_arrays(cls, highs, lows):
+        """Build the features by replaying the last HISTORY bars of the given arrays"""
+        features = cls()
+        for high, low in zip(highs[-cls.HISTORY:], lows[-cls.HISTORY:]):
+            features.update(high, low)
+        return features
+
+    def update(self, high, low):
+        """Fold in the high and low of a newly closed bar"""
+        if self.last_high is not None:
+            self.rising_highs = self.rising_highs + 1 if high > self.last_high else 0
+            self.falling_highs = self.falling_highs + 1 if high < self.last_high else 0
+            self.rising_lows = self.rising_lows + 1 if low > self.last_low else 0
+            self.falling_lows = self.falling_lows + 1 if low < self.last_low else 0
+        self.last_high = high
+        self.last_low = low
+        self.highs.append(high)
+        self.lows.append(low)
+
+        index = self.count
+        self.count += 1
+        for extreme in self._high_extremes:
+            if len(self.highs) > extreme.lag:
+                extreme.push(index - extreme.lag, self.highs[-1 - extreme.lag])
+        for extreme in self._low_extremes:
+            if len(self.lows) > extreme.lag:
+                extreme.push(index - extreme.lag, self.lows[-1 - extreme.lag])
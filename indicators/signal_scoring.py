@@ -0,0 +1,347 @@
+import numpy as np
+
+from indicators.technical_indicators import (
+    calculate_trendlines,
+    calculate_support_resistance,
+    calculate_volume_confidence
+)
+from indicators.candlestick_patterns import detect_candlestick_patterns
+from indicators.pattern_features import PatternFeatures
+
+
+class SignalScore:
+    """Outcome of scoring one symbol's bar window"""
+
+    def __init__(self):
+        self.direction = 0  # 1 for bullish, -1 for bearish, 0 for no signal
+        self.magnitude = 0.0
+        self.confidence = 0.0
+        self.bullish_signals = 0.0
+        self.bearish_signals = 0.0
+        self.triggered_bullish = []
+        self.triggered_bearish = []
+
+
+# Candlestick and chart patterns the scoring stage reads
+SCORED_PATTERNS = (
+    'bullish_engulfing', 'bearish_engulfing',
+    'bullish_harami', 'bullish_harami_cross', 'bearish_harami', 'bearish_harami_cross',
+    'piercing_line', 'head_and_shoulders', 'bull_flag', 'ascending_triangle', 'descending_triangle',
+    'rising_wedge', 'falling_wedge', 'cup_and_handle', 'megaphone', 'pennant'
+)
+
+
+def compute_features(opens, highs, lows, prices, volumes, features=None):
+    """Compute the indicator outputs the scoring stage reads, for the latest bar of a window
+
+    Parameters:
+    opens, highs, lows, prices, volumes (array): Bar window, oldest bar first
+    features (PatternFeatures): Incrementally maintained chart pattern features of the same bars
+
+    Returns:
+    dict: Scalar indicator values, the recent market returns and the pattern flags
+    """
+    upper_trendline, lower_trendline = calculate_trendlines(highs, lows)
+    support, resistance, historical_levels = calculate_support_resistance(prices)
+    patterns = detect_candlestick_patterns(highs, lows, prices, opens, features)
+
+    # Market return data for indicator strength evaluation
+    market_returns = []
+    for i in range(1, min(30, len(prices))):
+        market_returns.append((prices[-i] - prices[-i-1]) / prices[-i-1])
+
+    return {
+        'close': prices[-1],
+        'prev_close': prices[-2],
+        'close_10': prices[-10] if len(prices) >= 10 else np.nan,
+        'min_5': min(prices[-5:]),
+        'max_5': max(prices[-5:]),
+        'upper_trendline': upper_trendline[-1],
+        'upper_trendline_prev': upper_trendline[-2],
+        'lower_trendline': lower_trendline[-1],
+        'lower_trendline_prev': lower_trendline[-2],
+        'support': support,
+        'resistance': resistance,
+        'short_ma': np.mean(prices[-5:]),  # 5-period moving average
+        'long_ma': np.mean(prices[-20:]),  # 20-period moving average
+        'volume_confidence': calculate_volume_confidence(volumes),
+        'market_returns': market_returns,
+        'patterns': {name: bool(patterns.get(name)) for name in SCORED_PATTERNS}
+    }
+
+
+def score_symbol(indicator_strength, timestamp, symbol, opens, highs, lows, prices, volumes, min_threshold=1.0,
+                 features=None):
+    """Score the technical indicators of one symbol and record the triggered signals
+
+    Parameters:
+    indicator_strength (IndicatorStrength): Tracker used for weights and signal bookkeeping
+    timestamp (datetime): Time of the evaluation
+    symbol (Symbol): The asset symbol
+    opens, highs, lows, prices, volumes (array): Bar window, oldest bar first
+    min_threshold (float): Minimum bullish/bearish difference to generate a signal
+    features (PatternFeatures): Incrementally maintained chart pattern features of the same bars
+
+    Returns:
+    SignalScore: Direction, magnitude and confidence of the resulting signal
+    """
+    return score_features(indicator_strength, timestamp, symbol,
+                          compute_features(opens, highs, lows, prices, volumes, features), min_threshold)
+
+
+def score_features(indicator_strength, timestamp, symbol, values, min_threshold=1.0, record=True):
+    """Score precomputed indicator outputs of one symbol and record the triggered signals
+
+    Parameters:
+    indicator_strength (IndicatorStrength): Tracker used for weights and signal bookkeeping
+    timestamp (datetime): Time of the evaluation
+    symbol (Symbol): The asset symbol
+    values (dict): Indicator outputs as returned by compute_features
+    min_threshold (float): Minimum bullish/bearish difference to generate a signal
+    record (bool): Evaluate and record signals in indicator_strength; off when scoring a still
+        open bar, so the statistics only count closed bars
+
+    Returns:
+    SignalScore: Direction, magnitude and confidence of the resulting signal
+    """
+    score = SignalScore()
+    support = values['support']
+    resistance = values['resistance']
+    patterns = values['patterns']
+    confidence = values['volume_confidence']
+
+    current_price = values['close']
+
+    # Determine direction based on all indicators
+    bullish_signals = 0.0
+    bearish_signals = 0.0
+
+    # Initialize lists to track which signals triggered
+    triggered_bullish = score.triggered_bullish
+    triggered_bearish = score.triggered_bearish
+
+    # Evaluate signals for this symbol
+    if record:
+        indicator_strength.evaluate_signals(timestamp, symbol, current_price, values['market_returns'])
+        record_signal = indicator_strength.record_signal
+    else:
+        # Scoring a still open bar: weights are read, nothing is recorded
+        def record_signal(*args):
+            pass
+
+    # Check trendlines
+    trendline_indicator = "trendline"
+    trendline_weight = indicator_strength.get_indicator_weight(symbol, trendline_indicator)
+
+    if current_price > values['upper_trendline']:
+        bullish_signals += trendline_weight
+        triggered_bullish.append("Above upper trendline")
+        # Record this signal for future evaluation
+        record_signal(timestamp, symbol, trendline_indicator, "bullish", current_price)
+    elif current_price < values['lower_trendline']:
+        bearish_signals += trendline_weight
+        triggered_bearish.append("Below lower trendline")
+        # Record this signal for future evaluation
+        record_signal(timestamp, symbol, trendline_indicator, "bearish", current_price)
+
+    # Check trendline pullbacks and bounces
+    trendline_threshold = 0.02  # 2% threshold
+
+    # Bullish pullback to lower trendline
+    pullback_indicator = "trendline_pullback"
+    pullback_weight = indicator_strength.get_indicator_weight(symbol, pullback_indicator)
+
+    if (abs(current_price - values['lower_trendline']) / current_price < trendline_threshold and
+        values['prev_close'] < values['lower_trendline_prev']):  # Price crossing back above trendline
+        bullish_signals += pullback_weight
+        triggered_bullish.append("Bullish pullback to lower trendline")
+        record_signal(timestamp, symbol, pullback_indicator, "bullish", current_price)
+
+        # Check for bounce
+        bounce_indicator = "trendline_bounce"
+        bounce_weight = indicator_strength.get_indicator_weight(symbol, bounce_indicator)
+
+        if values['min_5'] < values['lower_trendline'] and current_price > values['lower_trendline']:
+            bullish_signals += bounce_weight  # Add extra signal for confirmed bounce
+            triggered_bullish.append("Confirmed bounce from lower trendline")
+            record_signal(timestamp, symbol, bounce_indicator, "bullish", current_price)
+
+    # Bearish pullback to upper trendline
+    if (abs(current_price - values['upper_trendline']) / current_price < trendline_threshold and
+        values['prev_close'] > values['upper_trendline_prev']):  # Price crossing back below trendline
+        bearish_signals += pullback_weight
+        triggered_bearish.append("Bearish pullback to upper trendline")
+        record_signal(timestamp, symbol, pullback_indicator, "bearish", current_price)
+
+        # Check for bounce
+        bounce_indicator = "trendline_bounce"
+        bounce_weight = indicator_strength.get_indicator_weight(symbol, bounce_indicator)
+
+        if values['max_5'] > values['upper_trendline'] and current_price < values['upper_trendline']:
+            bearish_signals += bounce_weight  # Add extra signal for confirmed bounce
+            triggered_bearish.append("Confirmed bounce from upper trendline")
+            record_signal(timestamp, symbol, bounce_indicator, "bearish", current_price)
+
+    # Check support/resistance
+    sr_indicator = "support_resistance"
+    sr_weight = indicator_strength.get_indicator_weight(symbol, sr_indicator)
+
+    if current_price < resistance and current_price > support:
+        if abs(current_price - resistance) < abs(current_price - support):
+            bearish_signals += sr_weight
+            triggered_bearish.append("Closer to resistance than support")
+            record_signal(timestamp, symbol, sr_indicator, "bearish", current_price)
+        else:
+            bullish_signals += sr_weight
+            triggered_bullish.append("Closer to support than resistance")
+            record_signal(timestamp, symbol, sr_indicator, "bullish", current_price)
+
+    # Check for support/resistance pullbacks and bounces
+    short_ma = values['short_ma']
+    long_ma = values['long_ma']
+
+    # Bullish pullback: Price pulls back to support in uptrend
+    sr_pullback_indicator = "sr_pullback"
+    sr_pullback_weight = indicator_strength.get_indicator_weight(symbol, sr_pullback_indicator)
+
+    if long_ma > short_ma and current_price > long_ma:
+        if abs(current_price - support) / current_price < 0.02:  # Within 2% of support
+            bullish_signals += sr_pullback_weight
+            triggered_bullish.append("Bullish pullback to support in uptrend")
+            record_signal(timestamp, symbol, sr_pullback_indicator, "bullish", current_price)
+
+            # Check for bounce from support
+            sr_bounce_indicator = "sr_bounce"
+            sr_bounce_weight = indicator_strength.get_indicator_weight(symbol, sr_bounce_indicator)
+
+            if values['min_5'] <= support and current_price > support:
+                bullish_signals += sr_bounce_weight
+                triggered_bullish.append("Confirmed bounce from support")
+                record_signal(timestamp, symbol, sr_bounce_indicator, "bullish", current_price)
+
+    # Bearish pullback: Price pulls back to resistance in downtrend
+    if long_ma < short_ma and current_price < long_ma:
+        if abs(current_price - resistance) / current_price < 0.02:  # Within 2% of resistance
+            bearish_signals += sr_pullback_weight
+            triggered_bearish.append("Bearish pullback to resistance in downtrend")
+            record_signal(timestamp, symbol, sr_pullback_indicator, "bearish", current_price)
+
+            # Check for bounce from resistance
+            sr_bounce_indicator = "sr_bounce"
+            sr_bounce_weight = indicator_strength.get_indicator_weight(symbol, sr_bounce_indicator)
+
+            if values['max_5'] >= resistance and current_price < resistance:
+                bearish_signals += sr_bounce_weight
+                triggered_bearish.append("Confirmed bounce from resistance")
+                record_signal(timestamp, symbol, sr_bounce_indicator, "bearish", current_price)
+
+    # Check candlestick patterns
+    # Process each pattern with its own weight
+
+    # Helper function to process pattern signals
+    def process_pattern(pattern_name, signal_type):
+        pattern_weight = indicator_strength.get_indicator_weight(symbol, f"pattern_{pattern_name}")
+        if signal_type == "bullish":
+            nonlocal bullish_signals
+            bullish_signals += pattern_weight
+            triggered_bullish.append(f"{pattern_name.replace('_', ' ').title()} pattern")
+        else:  # bearish
+            nonlocal bearish_signals
+            bearish_signals += pattern_weight
+            triggered_bearish.append(f"{pattern_name.replace('_', ' ').title()} pattern")
+
+        # Record signal for future evaluation
+        record_signal(
+            timestamp, symbol, f"pattern_{pattern_name}", signal_type, current_price
+        )
+
+    # Basic candlestick patterns
+    if patterns.get('bullish_engulfing'):
+        process_pattern('bullish_engulfing', 'bullish')
+
+    if patterns.get('bearish_engulfing'):
+        process_pattern('bearish_engulfing', 'bearish')
+
+    if patterns.get('bullish_harami') or patterns.get('bullish_harami_cross'):
+        process_pattern('bullish_harami', 'bullish')
+
+    if patterns.get('bearish_harami') or patterns.get('bearish_harami_cross'):
+        process_pattern('bearish_harami', 'bearish')
+
+    if patterns.get('piercing_line'):
+        process_pattern('piercing_line', 'bullish')
+
+    # Chart patterns
+    if patterns.get('head_and_shoulders'):
+        process_pattern('head_and_shoulders', 'bearish')
+
+    if patterns.get('bull_flag'):
+        process_pattern('bull_flag', 'bullish')
+
+    if patterns.get('ascending_triangle'):
+        process_pattern('ascending_triangle', 'bullish')
+
+    if patterns.get('descending_triangle'):
+        process_pattern('descending_triangle', 'bearish')
+
+    if patterns.get('rising_wedge'):
+        process_pattern('rising_wedge', 'bearish')  # Rising wedge is typically bearish
+
+    if patterns.get('falling_wedge'):
+        process_pattern('falling_wedge', 'bullish')  # Falling wedge is typically bullish
+
+    if patterns.get('cup_and_handle'):
+        process_pattern('cup_and_handle', 'bullish')
+
+    if patterns.get('megaphone'):
+        # Megaphone can be either bullish or bearish depending on context
+        if current_price > values['prev_close']:  # Using price action to determine direction
+            process_pattern('megaphone', 'bullish')
+        else:
+            process_pattern('megaphone', 'bearish')
+
+    if patterns.get('pennant'):
+        # Pennant follows the prior trend
+        if current_price > values['close_10']:  # Check if uptrend
+            process_pattern('pennant', 'bullish')
+        else:
+            process_pattern('pennant', 'bearish')
+
+    score.bullish_signals = bullish_signals
+    score.bearish_signals = bearish_signals
+
+    # Calculate signal difference and required threshold
+    signal_difference = abs(bullish_signals - bearish_signals)
+
+    if bullish_signals > bearish_signals and signal_difference >= min_threshold:
+        score.direction = 1
+        # Calculate magnitude based on price distances
+        score.magnitude = min(abs(resistance - current_price) / current_price,
+                              abs(values['upper_trendline'] - current_price) / current_price)
+
+    elif bearish_signals > bullish_signals and signal_difference >= min_threshold:
+        score.direction = -1
+        # Calculate magnitude based on price distances
+        score.magnitude = min(abs(support - current_price) / current_price,
+                              abs(values['lower_trendline'] - current_price) / current_price)
+
+    if score.direction != 0:
+        # Scale confidence by signal strength difference
+        score.confidence = min(confidence * (signal_difference / 5.0), 1.0)
+
+    return score
+
+
+def iter_features(opens, highs, lows, prices, volumes, window=200):
+    """Yield compute_features for every bar with a full window behind it, oldest first
+
+    Chart pattern features are maintained incrementally across the bars.
+    """
+    features = PatternFeatures()
+    for i in range(window - 1):
+        features.update(highs[i], lows[i])
+
+    for i in range(window, len(prices) + 1):
+        features.update(highs[i - 1], lows[i - 1])
+        yield compute_features(opens[i - window:i], highs[i - window:i], lows[i - window:i],
+                               prices[i - window:i], volumes[i - window:i], features)
@@ -1,9 +1,11 @@
 from AlgorithmImports import *
+import heapq
 
 
 from models.aplha_models.technical_alpha import TechnicalIndicatorAlphaModel
 from models.universe_selection.universe_selection import VolumeVolatilityUniverseSelectionModel
 from models.portfolio_construction.PortfolioConstructionModel import PortfolioConstructionModel
+from models.portfolio_construction.tolerance_band_rebalancer import ToleranceBandRebalancer
 from indicators.indicator_strength import IndicatorStrength
 
 
@@ -18,13 +20,24 @@ class TradingAlgorithm(QCAlgorithm):
         # Get the pairs that our brokerage supports and have a quote currency that
         # matches your account currency. We need this list in the universe selection function.
         self._market = Market.COINBASE
-        self._market_pairs = [
+        # Kept as a set so each CoinGecko entry is checked in constant time.
+        self._market_pairs = {
             x.key.symbol
             for x in self.symbol_properties_database.get_symbol_properties_list(self._market)
             if x.value.quote_currency == self.account_currency
-        ]
+        }
+        # Number of coins to hold, by market cap.
+        self._top_k = 10
+        # Return Universe.UNCHANGED when the largest coins are the same as in the last selection,
+        # so LEAN skips the subscription diff.
+        self._skip_unchanged_selection = True
+        self._selected_coins = None
+        # Symbol objects of coins selected before, by coin name.
+        self._coin_symbols = {}
         # Add a universe of Cryptocurrencies.
         self._universe = self.add_universe(CoinGeckoUniverse, self._select_assets)
+        # Only trade coins whose weight drifted more than 2% and by at least $10.
+        self._rebalancer = ToleranceBandRebalancer(drift_band=0.02, min_notional=10)
         # Add a Sheduled Event to rebalance the portfolio.
         self.schedule.on(self.date_rules.every_day(), self.time_rules.at(12, 0), self._rebalance)
 
@@ -33,20 +46,33 @@ class TradingAlgorithm(QCAlgorithm):
         # our account currency.
         tradable_coins = [d for d in data if d.coin + self.account_currency in self._market_pairs]
         self.info("tradable",tradable_coins)
-        # Select the largest coins and create their Symbol objects.
-        return [
-            c.create_symbol(self._market, self.account_currency)
-            for c in sorted(tradable_coins, key=lambda x: x.market_cap)[-10:]
-        ]
+        # Select the largest coins without sorting all tradable coins.
+        top_coins = heapq.nlargest(self._top_k, tradable_coins, key=lambda x: x.market_cap)
+        coins = frozenset(c.coin for c in top_coins)
+        if self._skip_unchanged_selection and coins == self._selected_coins:
+            return Universe.UNCHANGED
+        self._selected_coins = coins
+        return [self._coin_symbol(c) for c in top_coins]
+
+    def _coin_symbol(self, coin: CoinGeckoUniverse) -> Symbol:
+        # Create the Symbol of a coin once and reuse it in later selections.
+        symbol = self._coin_symbols.get(coin.coin)
+        if symbol is None:
+            symbol = self._coin_symbols[coin.coin] = coin.create_symbol(self._market, self.account_currency)
+        return symbol
 
     def _rebalance(self):
         if not self._universe.selected:
             return
         symbols = [symbol for symbol in self._universe.selected if self.securities[symbol].price]
-        # Liquidate coins that are no longer in the universe.
-        targets = [PortfolioTarget(symbol, 0) for symbol, holding in self.portfolio.items() if
-                   holding.invested and symbol not in symbols]
-        # Form an equal weighted portfolio of the coins in the universe.
-        targets += [PortfolioTarget(symbol, 0.5 / len(symbols)) for symbol in symbols]
-        # Place orders to rebalance the portfolio.
-        self.set_holdings(targets)
\ No newline at end of file
+        total_value = self.portfolio.total_portfolio_value
+        current_weights = {symbol: holding.holdings_value / total_value
+                           for symbol, holding in self.portfolio.items() if holding.invested}
+        # Form an equal weighted portfolio of the coins in the universe. Coins that are no longer
+        # in the universe are liquidated.
+        target_weights = {symbol: 0.5 / len(symbols) for symbol in symbols}
+        targets = [PortfolioTarget(symbol, weight) for symbol, weight in
+                   self._rebalancer.rebalance(target_weights, current_weights, total_value)]
+        # Place orders to rebalance the portfolio in a single submission.
+        if targets:
+            self.set_holdings(targets)
@@ -1,12 +1,35 @@
 """
 Trading strategy models including alpha and portfolio construction
+
+The LEAN-backed models are imported on first attribute access, so importing this
+package (or its LEAN-free helpers) does not require a LEAN runtime.
 """
-from models.universe_selection.universe_selection import VolumeVolatilityUniverseSelectionModel
-from models.aplha_models.technical_alpha import TechnicalIndicatorAlphaModel
-from models.portfolio_construction import PortfolioConstructionModel
-
-__all__ = [
-    'VolumeVolatilityUniverseSelectionModel',
-    'TechnicalIndicatorAlphaModel',
-    'PortfolioConstructionModel',
-]
+import importlib
+
+_LAZY_IMPORTS = {
+    'VolumeVolatilityUniverseSelectionModel': 'models.universe_selection.universe_selection',
+    'TechnicalIndicatorAlphaModel': 'models.aplha_models.technical_alpha',
+    'PortfolioConstructionModel': 'models.portfolio_construction.PortfolioConstructionModel',
+    'InsightCoalescer': 'models.aplha_models.insight_coalescer',
+    'BarBuffer': 'models.aplha_models.bar_buffer',
+    'MarketStateRegistry': 'models.aplha_models.market_state',
+    'EvaluationScheduler': 'models.aplha_models.evaluation_scheduler',
+    'ToleranceBandRebalancer': 'models.portfolio_construction.tolerance_band_rebalancer',
+    'StreamingCovariance': 'models.portfolio_construction.streaming_covariance',
+    'SymbolRegistry': 'models.symbol_registry',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
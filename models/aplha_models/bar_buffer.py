@@ -0,0 +1,154 @@
+from datetime import datetime
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_seconds(time):
+    """Convert a naive datetime to seconds since the epoch"""
+    return (time - EPOCH).total_seconds()
+
+
+class BarBuffer:
+    """
+    Buffers raw minute/second bars of one symbol in preallocated arrays and aggregates
+    them into a coarser timeframe in vectorized batches.
+
+    Raw bars are only written into arrays as they arrive. Completed timeframe buckets are
+    reduced with NumPy when flush() is called, and kept in a window of the most recent
+    aggregated bars, oldest first.
+    """
+
+    # Row order of the raw and aggregated arrays
+    TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+    def __init__(self, timeframe, window=200, capacity=4096):
+        """
+        Initialize the buffer
+
+        Parameters:
+        timeframe (float): Length of an aggregated bar in seconds
+        window (int): Number of aggregated bars kept
+        capacity (int): Initial number of raw bars that can be buffered between flushes
+        """
+        self.timeframe = timeframe
+        self.window = window
+        self.raw = np.empty((6, capacity))
+        self.raw_count = 0
+        # Twice the window so appends only compact occasionally
+        self.bars = np.empty((6, 2 * window))
+        self.bar_start = 0
+        self.bar_end = 0
+        self.bars_ingested = 0
+        self.bars_aggregated = 0
+
+    @property
+    def count(self):
+        return self.bar_end - self.bar_start
+
+    @property
+    def is_ready(self):
+        return self.count >= self.window
+
+    @property
+    def last_bar_end(self):
+        """End of the latest aggregated bar in seconds since the epoch, or None"""
+        if self.count == 0:
+            return None
+        return float(self.bars[self.TIME, self.bar_end - 1]) + self.timeframe
+
+    def append(self, time, open, high, low, close, volume):
+        """Buffer one raw bar; time is the bar start in seconds since the epoch"""
+        if self.raw_count == self.raw.shape[1]:
+            self._grow_raw(self.raw_count)
+        self.raw[:, self.raw_count] = (time, open, high, low, close, volume)
+        self.raw_count += 1
+        self.bars_ingested += 1
+
+    def extend(self, block):
+        """Buffer a (6, k) block of raw bars, oldest first"""
+        k = block.shape[1]
+        if self.raw_count + k > self.raw.shape[1]:
+            self._grow_raw(max(k, self.raw_count))
+        self.raw[:, self.raw_count:self.raw_count + k] = block
+        self.raw_count += k
+        self.bars_ingested += k
+
+    def flush(self, now):
+        """Aggregate every raw bucket that has closed by `now` into timeframe bars
+
+        Parameters:
+        now (float): Current time in seconds since the epoch
+
+        Returns:
+        int: Number of aggregated bars added
+        """
+        if self.raw_count == 0:
+            return 0
+        raw = self.raw[:, :self.raw_count]
+        buckets = np.floor(raw[self.TIME] / self.timeframe)
+        # Buckets are complete once their end time has passed
+        complete = int(np.searchsorted((buckets + 1) * self.timeframe, now, side='right'))
+        if complete == 0:
+            return 0
+
+        aggregated = self._aggregate(raw[:, :complete], buckets[:complete])
+        self._push_bars(aggregated)
+
+        remaining = self.raw_count - complete
+        self.raw[:, :remaining] = self.raw[:, complete:self.raw_count]
+        self.raw_count = remaining
+        return aggregated.shape[1]
+
+    def partial_bar(self):
+        """Aggregate the raw bars of the still open bucket, or None if there are none"""
+        if self.raw_count == 0:
+            return None
+        raw = self.raw[:, :self.raw_count]
+        buckets = np.floor(raw[self.TIME] / self.timeframe)
+        start = int(np.searchsorted(buckets, buckets[-1], side='left'))
+        return self._aggregate(raw[:, start:], buckets[start:])[:, 0]
+
+    def get_arrays(self, include_partial=False):
+        """Return open, high, low, close and volume arrays of the aggregated window, oldest bar first
+
+        Parameters:
+        include_partial (bool): Append the still open bucket as the latest bar and drop the oldest one
+        """
+        bars = self.bars[:, max(self.bar_start, self.bar_end - self.window):self.bar_end]
+        if include_partial:
+            partial = self.partial_bar()
+            if partial is not None:
+                bars = np.column_stack([bars[:, 1:] if bars.shape[1] >= self.window else bars, partial])
+        return (bars[self.OPEN], bars[self.HIGH], bars[self.LOW], bars[self.CLOSE], bars[self.VOLUME])
+
+    def _aggregate(self, raw, buckets):
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        ends = np.concatenate((starts[1:], [raw.shape[1]])) - 1
+        aggregated = np.empty((6, len(starts)))
+        aggregated[self.TIME] = buckets[starts] * self.timeframe
+        aggregated[self.OPEN] = raw[self.OPEN, starts]
+        aggregated[self.HIGH] = np.maximum.reduceat(raw[self.HIGH], starts)
+        aggregated[self.LOW] = np.minimum.reduceat(raw[self.LOW], starts)
+        aggregated[self.CLOSE] = raw[self.CLOSE, ends]
+        aggregated[self.VOLUME] = np.add.reduceat(raw[self.VOLUME], starts)
+        return aggregated
+
+    def _push_bars(self, aggregated):
+        self.bars_aggregated += aggregated.shape[1]
+        # Only the last `window` bars can ever be read back
+        aggregated = aggregated[:, -self.window:]
+        k = aggregated.shape[1]
+        if self.bar_end + k > self.bars.shape[1]:
+            keep = min(self.count, self.window - k)
+            self.bars[:, :keep] = self.bars[:, self.bar_end - keep:self.bar_end]
+            self.bar_start, self.bar_end = 0, keep
+        self.bars[:, self.bar_end:self.bar_end + k] = aggregated
+        self.bar_end += k
+        self.bar_start = max(self.bar_start, self.bar_end - self.window)
+
+    def _grow_raw(self, extra):
+        raw = np.empty((6, self.raw.shape[1] + extra))
+        raw[:, :self.raw_count] = self.raw[:, :self.raw_count]
+        self.raw = raw
@@ -0,0 +1,89 @@
+import time
+from datetime import timedelta
+
+
+class EvaluationScheduler:
+    """
+    Runs per-symbol evaluations within a time budget per alpha Update.
+
+    Pending evaluations run in order of priority (current holdings, strength of the last
+    signal, time since the last evaluation). Once the budget is used up the rest is
+    deferred to the next cycle; since waiting raises a symbol's priority, deferred symbols
+    move to the front over time. Deferral counts and lateness are kept for reporting.
+    """
+
+    def __init__(self, budget=timedelta(seconds=1), holding_weight=10.0, signal_weight=1.0,
+                 staleness_weight=1.0, clock=time.perf_counter):
+        """
+        Initialize the scheduler
+
+        Parameters:
+        budget (timedelta): Wall-clock time one cycle may spend on evaluations
+        holding_weight (float): Priority added for symbols currently held
+        signal_weight (float): Priority per unit of the last bullish/bearish difference
+        staleness_weight (float): Priority per evaluation period since the last evaluation
+        clock (callable): Returns wall-clock seconds
+        """
+        self.budget = budget.total_seconds()
+        self.holding_weight = holding_weight
+        self.signal_weight = signal_weight
+        self.staleness_weight = staleness_weight
+        self.clock = clock
+
+        self.cycles = 0
+        self.total_deferrals = 0
+        self.deferral_counts = {}  # {symbol: times deferred}
+        self.last_deferred = []
+        self.last_lateness = 0.0  # Seconds, worst evaluation of the last cycle
+        self.max_lateness = 0.0
+
+    def priority(self, held, signal_strength, periods_waited):
+        """Priority of a pending evaluation, higher runs first
+
+        Parameters:
+        held (bool): Whether the portfolio holds the symbol
+        signal_strength (float): Absolute bullish/bearish difference of the last score
+        periods_waited (float): Evaluation periods since the symbol was last evaluated
+
+        Returns:
+        float: The priority
+        """
+        return (self.holding_weight * held + self.signal_weight * signal_strength +
+                self.staleness_weight * periods_waited)
+
+    def run(self, tasks, now):
+        """Run pending evaluations in priority order until the budget is used up
+
+        At least one evaluation runs per cycle, so the model always makes progress.
+
+        Parameters:
+        tasks (list): (symbol, priority, due time, callable) tuples; the callable is called with `now`
+        now (datetime): Current algorithm time
+
+        Returns:
+        tuple: (evaluated symbols, deferred symbols)
+        """
+        start = self.clock()
+        completed = []
+        deferred = []
+        lateness = 0.0
+        for symbol, _, due, evaluate in sorted(tasks, key=lambda task: task[1], reverse=True):
+            if completed and self.clock() - start >= self.budget:
+                deferred.append(symbol)
+                self.deferral_counts[symbol] = self.deferral_counts.get(symbol, 0) + 1
+                continue
+            evaluate(now)
+            completed.append(symbol)
+            # Time the result became available after it was due
+            lateness = max(lateness, (now - due).total_seconds() + self.clock() - start)
+
+        self.cycles += 1
+        self.total_deferrals += len(deferred)
+        self.last_deferred = deferred
+        self.last_lateness = lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+        return completed, deferred
+
+    def remove(self, symbol):
+        """Forget the deferral count of a symbol that left the universe"""
+        self.deferral_counts.pop(symbol, None)
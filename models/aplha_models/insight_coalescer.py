@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+
+class InsightCoalescer:
+    """
+    Keeps a single active insight per symbol between the alpha model and portfolio construction.
+
+    A new insight is only let through when the direction changes, when magnitude or
+    confidence moves by more than a tolerance, or when the active insight is about to
+    expire and has to be extended. Otherwise the already active insight stands.
+    """
+
+    def __init__(self, period=timedelta(days=1), refresh_before=timedelta(hours=1),
+                 magnitude_tolerance=0.005, confidence_tolerance=0.1):
+        """
+        Initialize the coalescer
+
+        Parameters:
+        period (timedelta): Lifetime of the emitted insights
+        refresh_before (timedelta): Re-emit an unchanged insight when it expires within this window
+        magnitude_tolerance (float): Absolute magnitude change that triggers an update
+        confidence_tolerance (float): Absolute confidence change that triggers an update
+        """
+        self.period = period
+        self.refresh_before = refresh_before
+        self.magnitude_tolerance = magnitude_tolerance
+        self.confidence_tolerance = confidence_tolerance
+        # Structure: {symbol: ActiveInsight}
+        self.active = {}
+
+    class ActiveInsight:
+        def __init__(self, direction, magnitude, confidence, expiry, insight=None):
+            self.direction = direction
+            self.magnitude = magnitude
+            self.confidence = confidence
+            self.expiry = expiry
+            self.insight = insight  # Emitted framework object, kept so it can be cancelled
+
+    def should_emit(self, symbol, time, direction, magnitude, confidence):
+        """Check whether a signal differs enough from the active insight to be emitted
+
+        Parameters:
+        symbol (Symbol): The asset symbol
+        time (datetime): Current algorithm time
+        direction (int): 1 for up, -1 for down
+        magnitude (float): Expected move of the new signal
+        confidence (float): Confidence of the new signal
+
+        Returns:
+        bool: True if a new insight should be emitted
+        """
+        active = self.active.get(symbol)
+        if active is None or time >= active.expiry:
+            return True
+        if active.direction != direction:
+            return True
+        if active.expiry - time <= self.refresh_before:
+            return True
+        return (abs(magnitude - active.magnitude) > self.magnitude_tolerance or
+                abs(confidence - active.confidence) > self.confidence_tolerance)
+
+    def replace(self, symbol, time, direction, magnitude, confidence, insight=None):
+        """Make a newly emitted insight the active one for its symbol
+
+        Returns:
+        The previously active insight object if it has not expired yet, else None
+        """
+        previous = self.active.get(symbol)
+        self.active[symbol] = self.ActiveInsight(direction, magnitude, confidence, time + self.period, insight)
+        if previous is None or time >= previous.expiry:
+            return None
+        return previous.insight
+
+    def remove(self, symbol):
+        """Forget the active insight of a symbol leaving the universe"""
+        self.active.pop(symbol, None)
@@ -0,0 +1,186 @@
+from datetime import timedelta
+
+import numpy as np
+
+from QuantConnect.Data.Market import TradeBar
+from QuantConnect.Indicators import RollingWindow
+from QuantConnect.Data.Consolidators import TradeBarConsolidator
+
+from indicators.pattern_features import PatternFeatures
+from indicators.signal_scoring import compute_features
+from models.aplha_models.bar_buffer import EPOCH, BarBuffer, to_seconds
+
+
+class MarketState:
+    """
+    Bars and memoized indicator outputs of one (symbol, timeframe), shared by every alpha
+    model instance that trades the symbol.
+
+    With hourly data the state owns the consolidator; with Minute/Second data it owns the
+    BarBuffer. Indicator outputs are computed at most once per bar (or per evaluation time
+    for the still open bar) however many alpha instances read them.
+    """
+
+    def __init__(self, algorithm, symbol, timeframe=timedelta(hours=1), buffered=False, window=200):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.buffered = buffered
+        self.ref_count = 0
+        self.listeners = []  # Called with (sender, bar) after a consolidated bar was added
+        self._values = None
+        self._values_time = None
+        self._closed_values = None
+        self._closed_count = None
+
+        if buffered:
+            self.buffer = BarBuffer(timeframe.total_seconds(), window=window)
+            self.last_ingested = None
+            self.window = None
+            self.features = None
+            self.consolidator = None
+            return
+        self.buffer = None
+        self.window = RollingWindow[TradeBar](window)
+        self.features = PatternFeatures()
+        self.consolidator = TradeBarConsolidator(timeframe)
+        self.consolidator.DataConsolidated += self.OnDataConsolidated
+        algorithm.SubscriptionManager.AddConsolidator(symbol, self.consolidator)
+
+    @property
+    def is_ready(self):
+        return self.buffer.is_ready if self.buffered else self.window.IsReady
+
+    def OnDataConsolidated(self, sender, bar):
+        self.window.Add(bar)
+        self.features.update(bar.High, bar.Low)
+        self._values = None
+        for listener in list(self.listeners):
+            listener(sender, bar)
+
+    def get_arrays(self):
+        """Return open, high, low, close and volume arrays of the consolidated window, oldest bar first"""
+        bars = list(self.window)
+        bars.reverse()
+        return (np.array([bar.Open for bar in bars]),
+                np.array([bar.High for bar in bars]),
+                np.array([bar.Low for bar in bars]),
+                np.array([bar.Close for bar in bars]),
+                np.array([bar.Volume for bar in bars]))
+
+    def get_values(self):
+        """Indicator outputs of the latest consolidated bar, computed once per bar"""
+        if self._values is None:
+            opens, highs, lows, prices, volumes = self.get_arrays()
+            self._values = compute_features(opens, highs, lows, prices, volumes, self.features)
+        return self._values
+
+    def ingest(self, bar):
+        """Buffer a raw Minute/Second bar; bars already ingested by another alpha instance are skipped"""
+        time = to_seconds(bar.Time)
+        if self.last_ingested is not None and time <= self.last_ingested:
+            return
+        self.last_ingested = time
+        self.buffer.append(time, bar.Open, bar.High, bar.Low, bar.Close, bar.Volume)
+
+    @property
+    def bars_aggregated(self):
+        """Number of closed bars aggregated so far in buffered mode"""
+        return self.buffer.bars_aggregated
+
+    @property
+    def last_bar_end(self):
+        """End time of the latest closed bar in buffered mode"""
+        end = self.buffer.last_bar_end
+        return None if end is None else EPOCH + timedelta(seconds=end)
+
+    def get_closed_values(self):
+        """Indicator outputs of the latest closed bar in buffered mode, computed once per bar
+
+        Returns:
+        dict: compute_features output, or None if the window is not filled yet
+        """
+        count = self.buffer.bars_aggregated
+        if self._closed_count != count:
+            self._closed_count = count
+            self._closed_values = None
+            if self.buffer.is_ready:
+                self._closed_values = compute_features(*self.buffer.get_arrays())
+        return self._closed_values
+
+    def evaluate(self, time):
+        """Indicator outputs including the still open bar at `time`, computed once per time
+
+        Returns:
+        dict: compute_features output, or None if the window is not filled yet
+        """
+        if self._values_time == time:
+            return self._values
+        self.buffer.flush(to_seconds(time))
+        self._values_time = time
+        self._values = None
+        if self.buffer.is_ready:
+            opens, highs, lows, prices, volumes = self.buffer.get_arrays(include_partial=True)
+            self._values = compute_features(opens, highs, lows, prices, volumes)
+        return self._values
+
+
+class MarketStateRegistry:
+    """
+    Reference-counted registry of MarketState objects keyed by (symbol, timeframe, buffered).
+
+    The first alpha instance that acquires a key creates the state (and its consolidator);
+    the last one that releases it removes the consolidator again. States hold consolidators
+    registered with one algorithm, so a registry must not outlive or be shared across algorithms.
+    """
+
+    # Attribute of the algorithm instance holding its default registry
+    ALGORITHM_ATTRIBUTE = '_market_state_registry'
+
+    def __init__(self):
+        self.states = {}
+
+    @classmethod
+    def default(cls, algorithm):
+        """The registry shared by the models of one algorithm that are not given one
+
+        It is stored on the algorithm instance, so another algorithm or QuantBook in the
+        same process gets its own registry.
+        """
+        registry = getattr(algorithm, cls.ALGORITHM_ATTRIBUTE, None)
+        if registry is None:
+            registry = cls()
+            setattr(algorithm, cls.ALGORITHM_ATTRIBUTE, registry)
+        return registry
+
+    def acquire(self, algorithm, symbol, timeframe=timedelta(hours=1), buffered=False, listener=None):
+        """Get the shared state of a symbol, creating it on first use
+
+        Parameters:
+        algorithm (QCAlgorithm): The algorithm instance
+        symbol (Symbol): The asset symbol
+        timeframe (timedelta): Consolidated bar length
+        buffered (bool): Buffer Minute/Second bars instead of using a consolidator
+        listener (callable): Called with (sender, bar) on every consolidated bar
+
+        Returns:
+        MarketState: The shared state
+        """
+        key = (symbol, timeframe, buffered)
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = MarketState(algorithm, symbol, timeframe, buffered)
+        state.ref_count += 1
+        if listener is not None:
+            state.listeners.append(listener)
+        return state
+
+    def release(self, algorithm, state, listener=None):
+        """Drop one reference to a state, removing its consolidator with the last one"""
+        if listener is not None and listener in state.listeners:
+            state.listeners.remove(listener)
+        state.ref_count -= 1
+        if state.ref_count > 0:
+            return
+        del self.states[(state.symbol, state.timeframe, state.buffered)]
+        if state.consolidator is not None:
+            algorithm.SubscriptionManager.RemoveConsolidator(state.symbol, state.consolidator)
@@ -1,318 +1,250 @@
 from datetime import timedelta, datetime
-import numpy as np
-from QuantConnect.Algorithm.Framework.Alphas import AlphaModel, Insight, InsightDirection, InsightType
-from QuantConnect.Data.Market import TradeBar
-from QuantConnect.Indicators.CandlestickPatterns import *
+from QuantConnect.Algorithm.Framework.Alphas import AlphaModel, Insight, InsightDirection
 
 from indicators.indicator_strength import IndicatorStrength
-from indicators.technical_indicators import (
-    calculate_trendlines,
-    calculate_support_resistance,
-    calculate_fibonacci_levels,
-    calculate_volume_confidence
-)
-from indicators.candlestick_patterns import detect_candlestick_patterns
+from indicators.signal_scoring import score_features
+from models.aplha_models.insight_coalescer import InsightCoalescer
+from models.aplha_models.market_state import MarketStateRegistry
+from models.symbol_registry import SymbolRegistry
 from QuantConnect import Resolution
-from QuantConnect.Indicators import RollingWindow
-from QuantConnect.Data.Consolidators import TradeBarConsolidator
 
 class TechnicalIndicatorAlphaModel(AlphaModel):
-    def __init__(self, indicator_strength=None):
+    def __init__(self, indicator_strength=None, insight_coalescer=None,
+                 resolution=Resolution.Hour, evaluation_period=timedelta(hours=1),
+                 min_threshold=1.0, market_state=None, symbol_registry=None, scheduler=None):
+        """
+        Parameters:
+        indicator_strength (IndicatorStrength): Shared indicator performance tracker
+        insight_coalescer (InsightCoalescer): Keeps one active insight per symbol
+        resolution (Resolution): Subscription resolution; Minute or Second data is buffered and
+            aggregated into hourly bars in batches instead of through a consolidator
+        evaluation_period (timedelta): How often symbols are evaluated; can be below one hour
+            with Minute or Second data, the still open hourly bar is then scored as the latest bar
+        min_threshold (float): Minimum bullish/bearish difference to generate an insight
+        market_state (MarketStateRegistry): Registry of shared bars and indicator outputs; defaults to
+            the one of the algorithm, so several parameterizations of this model share that work
+        symbol_registry (SymbolRegistry): Interns symbols as integer ids; symbolData, the coalescer and
+            the indicator_strength tracker are keyed by id, Symbols are only used to emit insights;
+            defaults to the one of the algorithm
+        scheduler (EvaluationScheduler): In live mode, evaluates symbols in priority order within a time
+            budget per Update and defers the rest; without one every symbol is evaluated every cycle
+        """
         self.name="TechnicalIndicatorAlphaModel"
         super().__init__()
         self.symbolData = {}
-        self.resolution = Resolution.Hour
+        self.resolution = resolution
+        self.buffered = resolution in (Resolution.Minute, Resolution.Second)
+        self.timeframe = timedelta(hours=1)
         self.period = 20
-        self.rebalancingPeriod = timedelta(hours=1)
+        self.rebalancingPeriod = evaluation_period
+        self.min_threshold = min_threshold
         self.nextRebalance = datetime.min
+        self.insightPeriod = timedelta(days=1)
 
         # Use provided indicator_strength object or create a new one
         self.indicator_strength = indicator_strength if indicator_strength is not None else IndicatorStrength()
+
+        # Use provided insight_coalescer object or create one matching the insight period and rebalance cadence
+        self.insight_coalescer = insight_coalescer if insight_coalescer is not None else \
+            InsightCoalescer(period=self.insightPeriod, refresh_before=self.rebalancingPeriod)
+
+        # Use provided registries or the ones of the algorithm, resolved once it is known
+        self.market_state = market_state
+        self.symbol_registry = symbol_registry
+
+        self.scheduler = scheduler
         
     class SymbolData:
-        def __init__(self, algorithm, symbol):
+        def __init__(self, algorithm, symbol, symbol_id, indicator_strength, registry, timeframe=timedelta(hours=1),
+                     buffered=False, min_threshold=1.0, scheduled=False):
             self.symbol = symbol
+            self.symbol_id = symbol_id
             self.algorithm = algorithm
-            self.window = RollingWindow[TradeBar](200)
-            self.consolidator = TradeBarConsolidator(timedelta(hours=1))
-            self.consolidator.DataConsolidated += self.OnDataConsolidated
-            algorithm.SubscriptionManager.AddConsolidator(symbol, self.consolidator)
-            
+            self.indicator_strength = indicator_strength
+            self.registry = registry
+            self.min_threshold = min_threshold
+            # Latest signal score and whether it changed since the last Update
+            self.score = None
+            self.dirty = False
+            # With a scheduler, closed bars are only marked pending here and scored from Update
+            self.scheduled = scheduled
+            self.pending = None  # Time the pending evaluation became due
+            self.bar_time = None
+            self.last_evaluated = None
+            # Buffered mode: raw bar time of the last evaluation and closed bars already recorded
+            self.evaluated_ingest = None
+            self.recorded_bars = 0
+            # Bars, consolidator and indicator outputs are shared with other alpha instances
+            self.state = registry.acquire(algorithm, symbol, timeframe, buffered,
+                                          None if buffered else self.OnDataConsolidated)
+
         def OnDataConsolidated(self, sender, bar):
-            self.window.Add(bar)
+            if not self.state.is_ready:
+                return
+
+            if self.scheduled:
+                if self.pending is None:
+                    self.pending = bar.EndTime
+                self.bar_time = bar.EndTime
+                return
+
+            # Recompute as soon as the bar closes, so Update only gathers cached scores
+            self.score_bar(bar.EndTime)
+
+        def score_bar(self, time):
+            """Score the latest consolidated bar"""
+            self.score = score_features(self.indicator_strength, time, self.symbol_id,
+                                        self.state.get_values(), self.min_threshold)
+            self.dirty = True
+
+        def ingest(self, bar):
+            """Buffer a raw Minute/Second bar"""
+            self.state.ingest(bar)
+
+        @property
+        def has_new_bars(self):
+            """Whether raw bars were ingested since the last evaluation"""
+            return self.state.last_ingested is not None and self.state.last_ingested != self.evaluated_ingest
+
+        def evaluate(self, time):
+            """Score the aggregated window including the still open bar
+
+            Symbols without new raw bars keep their score. Signals are recorded in the strength
+            tracker once per closed bar; the open bar score only drives insights, so the
+            statistics do not depend on the evaluation period.
+            """
+            if not self.has_new_bars:
+                return
+            self.evaluated_ingest = self.state.last_ingested
+            values = self.state.evaluate(time)
+            if values is None:
+                return
+
+            if self.state.bars_aggregated != self.recorded_bars:
+                self.recorded_bars = self.state.bars_aggregated
+                score_features(self.indicator_strength, self.state.last_bar_end, self.symbol_id,
+                               self.state.get_closed_values(), self.min_threshold)
+
+            self.score = score_features(self.indicator_strength, time, self.symbol_id, values,
+                                        self.min_threshold, record=False)
+            self.dirty = True
+
+        def run(self, time):
+            """Run the pending evaluation, scoring the latest bar"""
+            self.pending = None
+            self.last_evaluated = time
+            if self.state.buffered:
+                self.evaluate(time)
+            else:
+                self.score_bar(self.bar_time)
+
+        def dispose(self):
+            """Release the shared market state"""
+            self.registry.release(self.algorithm, self.state,
+                                  None if self.state.buffered else self.OnDataConsolidated)
             
     def Update(self, algorithm, data):
+        if self.buffered:
+            for symbolData in self.symbolData.values():
+                if data.Bars.ContainsKey(symbolData.symbol):
+                    symbolData.ingest(data.Bars[symbolData.symbol])
+
         if algorithm.Time <= self.nextRebalance:
             return []
             
         self.nextRebalance = algorithm.Time + self.rebalancingPeriod
+
+        if self.scheduler is not None and algorithm.LiveMode:
+            self.run_scheduled(algorithm)
+        elif self.buffered:
+            for symbolData in self.symbolData.values():
+                symbolData.evaluate(algorithm.Time)
         
         insights = []
-        for symbol, symbolData in self.symbolData.items():
-            if not symbolData.window.IsReady:
+        for symbol_id, symbolData in self.symbolData.items():
+            # Symbols without a new consolidated bar keep their active insight
+            if not symbolData.dirty:
                 continue
-                
-            # Get price data
-            #Todo does reserve do what it should here
-            prices = np.array([bar.Close for bar in reversed(list(symbolData.window))])
-            highs = np.array([bar.High for bar in reversed(list(symbolData.window))])
-            lows = np.array([bar.Low for bar in reversed(list(symbolData.window))])
-            volumes = np.array([bar.Volume for bar in reversed(list(symbolData.window))])
-            opens = np.array([bar.Open for bar in reversed(list(symbolData.window))])
-            
-            # Calculate indicators
-            upper_trendline, lower_trendline = calculate_trendlines(highs, lows)
-            support, resistance, historical_levels = calculate_support_resistance(prices)
-            fib_levels = calculate_fibonacci_levels(prices)
-            patterns = detect_candlestick_patterns(highs, lows, prices, opens)
-            confidence = calculate_volume_confidence(volumes)
-            
-            # Generate insights based on technical indicators
-            current_price = prices[-1]
-            
-            # Determine direction based on all indicators
-            bullish_signals = 0.0
-            bearish_signals = 0.0
-
-            # Initialize lists to track which signals triggered
-            triggered_bullish = []
-            triggered_bearish = []
-
-            # Market return data for indicator strength evaluation
-            market_returns = []
-            for i in range(1, min(30, len(prices))):
-                market_returns.append((prices[-i] - prices[-i-1]) / prices[-i-1])
-
-            # Evaluate signals for this symbol
-            self.indicator_strength.evaluate_signals(algorithm.Time, symbol, current_price, market_returns)
-            
-            # Check trendlines
-            trendline_indicator = "trendline"
-            trendline_weight = self.indicator_strength.get_indicator_weight(symbol, trendline_indicator)
-
-            if current_price > upper_trendline[-1]:
-                bullish_signals += trendline_weight
-                triggered_bullish.append("Above upper trendline")
-                # Record this signal for future evaluation
-                self.indicator_strength.record_signal(algorithm.Time, symbol, trendline_indicator, "bullish", current_price)
-            elif current_price < lower_trendline[-1]:
-                bearish_signals += trendline_weight
-                triggered_bearish.append("Below lower trendline")
-                # Record this signal for future evaluation
-                self.indicator_strength.record_signal(algorithm.Time, symbol, trendline_indicator, "bearish", current_price)
-                
-            # Check trendline pullbacks and bounces
-            trendline_threshold = 0.02  # 2% threshold
-            price_history = prices[-5:]  # Look at last 5 periods
-            
-            # Bullish pullback to lower trendline
-            pullback_indicator = "trendline_pullback"
-            pullback_weight = self.indicator_strength.get_indicator_weight(symbol, pullback_indicator)
-
-            if (abs(current_price - lower_trendline[-1]) / current_price < trendline_threshold and
-                prices[-2] < lower_trendline[-2]):  # Price crossing back above trendline
-                bullish_signals += pullback_weight
-                triggered_bullish.append("Bullish pullback to lower trendline")
-                self.indicator_strength.record_signal(algorithm.Time, symbol, pullback_indicator, "bullish", current_price)
-
-                # Check for bounce
-                bounce_indicator = "trendline_bounce"
-                bounce_weight = self.indicator_strength.get_indicator_weight(symbol, bounce_indicator)
-
-                if min(price_history) < lower_trendline[-1] and current_price > lower_trendline[-1]:
-                    bullish_signals += bounce_weight  # Add extra signal for confirmed bounce
-                    triggered_bullish.append("Confirmed bounce from lower trendline")
-                    self.indicator_strength.record_signal(algorithm.Time, symbol, bounce_indicator, "bullish", current_price)
-
-            # Bearish pullback to upper trendline    
-            if (abs(current_price - upper_trendline[-1]) / current_price < trendline_threshold and
-                prices[-2] > upper_trendline[-2]):  # Price crossing back below trendline
-                bearish_signals += pullback_weight
-                triggered_bearish.append("Bearish pullback to upper trendline")
-                self.indicator_strength.record_signal(algorithm.Time, symbol, pullback_indicator, "bearish", current_price)
-
-                # Check for bounce
-                bounce_indicator = "trendline_bounce"
-                bounce_weight = self.indicator_strength.get_indicator_weight(symbol, bounce_indicator)
-
-                if max(price_history) > upper_trendline[-1] and current_price < upper_trendline[-1]:
-                    bearish_signals += bounce_weight  # Add extra signal for confirmed bounce
-                    triggered_bearish.append("Confirmed bounce from upper trendline")
-                    self.indicator_strength.record_signal(algorithm.Time, symbol, bounce_indicator, "bearish", current_price)
-                
-            # Check support/resistance
-            sr_indicator = "support_resistance"
-            sr_weight = self.indicator_strength.get_indicator_weight(symbol, sr_indicator)
-
-            if current_price < resistance and current_price > support:
-                if abs(current_price - resistance) < abs(current_price - support):
-                    bearish_signals += sr_weight
-                    triggered_bearish.append("Closer to resistance than support")
-                    self.indicator_strength.record_signal(algorithm.Time, symbol, sr_indicator, "bearish", current_price)
-                else:
-                    bullish_signals += sr_weight
-                    triggered_bullish.append("Closer to support than resistance")
-                    self.indicator_strength.record_signal(algorithm.Time, symbol, sr_indicator, "bullish", current_price)
-                    
-            # Check for support/resistance pullbacks and bounces
-            short_ma = np.mean(prices[-5:])  # 5-period moving average
-            long_ma = np.mean(prices[-20:])  # 20-period moving average
-            
-            # Bullish pullback: Price pulls back to support in uptrend
-            sr_pullback_indicator = "sr_pullback"
-            sr_pullback_weight = self.indicator_strength.get_indicator_weight(symbol, sr_pullback_indicator)
-
-            if long_ma > short_ma and current_price > long_ma:
-                if abs(current_price - support) / current_price < 0.02:  # Within 2% of support
-                    bullish_signals += sr_pullback_weight
-                    triggered_bullish.append("Bullish pullback to support in uptrend")
-                    self.indicator_strength.record_signal(algorithm.Time, symbol, sr_pullback_indicator, "bullish", current_price)
-
-                    # Check for bounce from support
-                    sr_bounce_indicator = "sr_bounce"
-                    sr_bounce_weight = self.indicator_strength.get_indicator_weight(symbol, sr_bounce_indicator)
-
-                    if min(price_history) <= support and current_price > support:
-                        bullish_signals += sr_bounce_weight
-                        triggered_bullish.append("Confirmed bounce from support")
-                        self.indicator_strength.record_signal(algorithm.Time, symbol, sr_bounce_indicator, "bullish", current_price)
-
-            # Bearish pullback: Price pulls back to resistance in downtrend  
-            if long_ma < short_ma and current_price < long_ma:
-                if abs(current_price - resistance) / current_price < 0.02:  # Within 2% of resistance
-                    bearish_signals += sr_pullback_weight
-                    triggered_bearish.append("Bearish pullback to resistance in downtrend")
-                    self.indicator_strength.record_signal(algorithm.Time, symbol, sr_pullback_indicator, "bearish", current_price)
-
-                    # Check for bounce from resistance
-                    sr_bounce_indicator = "sr_bounce"
-                    sr_bounce_weight = self.indicator_strength.get_indicator_weight(symbol, sr_bounce_indicator)
+            symbolData.dirty = False
+            score = symbolData.score
+            symbol = symbolData.symbol
 
-                    if max(price_history) >= resistance and current_price < resistance:
-                        bearish_signals += sr_bounce_weight
-                        triggered_bearish.append("Confirmed bounce from resistance")
-                        self.indicator_strength.record_signal(algorithm.Time, symbol, sr_bounce_indicator, "bearish", current_price)
-                    
-            # Check candlestick patterns
-            # Process each pattern with its own weight
-
-            # Helper function to process pattern signals
-            def process_pattern(pattern_name, signal_type):
-                pattern_weight = self.indicator_strength.get_indicator_weight(symbol, f"pattern_{pattern_name}")
-                if signal_type == "bullish":
-                    nonlocal bullish_signals
-                    bullish_signals += pattern_weight
-                    triggered_bullish.append(f"{pattern_name.replace('_', ' ').title()} pattern")
-                else:  # bearish
-                    nonlocal bearish_signals
-                    bearish_signals += pattern_weight
-                    triggered_bearish.append(f"{pattern_name.replace('_', ' ').title()} pattern")
-
-                # Record signal for future evaluation
-                self.indicator_strength.record_signal(
-                    algorithm.Time, symbol, f"pattern_{pattern_name}", signal_type, current_price
-                )
-
-            # Basic candlestick patterns
-            if patterns.get('bullish_engulfing'):
-                process_pattern('bullish_engulfing', 'bullish')
-
-            if patterns.get('bearish_engulfing'):
-                process_pattern('bearish_engulfing', 'bearish')
-
-            if patterns.get('bullish_harami') or patterns.get('bullish_harami_cross'):
-                process_pattern('bullish_harami', 'bullish')
-
-            if patterns.get('bearish_harami') or patterns.get('bearish_harami_cross'):
-                process_pattern('bearish_harami', 'bearish')
-
-            if patterns.get('piercing_line'):
-                process_pattern('piercing_line', 'bullish')
-
-            # Chart patterns
-            if patterns.get('head_and_shoulders'):
-                process_pattern('head_and_shoulders', 'bearish')
-
-            if patterns.get('bull_flag'):
-                process_pattern('bull_flag', 'bullish')
-
-            if patterns.get('ascending_triangle'):
-                process_pattern('ascending_triangle', 'bullish')
-
-            if patterns.get('descending_triangle'):
-                process_pattern('descending_triangle', 'bearish')
-
-            if patterns.get('rising_wedge'):
-                process_pattern('rising_wedge', 'bearish')  # Rising wedge is typically bearish
-
-            if patterns.get('falling_wedge'):
-                process_pattern('falling_wedge', 'bullish')  # Falling wedge is typically bullish
-
-            if patterns.get('cup_and_handle'):
-                process_pattern('cup_and_handle', 'bullish')
-
-            if patterns.get('megaphone'):
-                # Megaphone can be either bullish or bearish depending on context
-                if current_price > prices[-2]:  # Using price action to determine direction
-                    process_pattern('megaphone', 'bullish')
-                else:
-                    process_pattern('megaphone', 'bearish')
-
-            if patterns.get('pennant'):
-                # Pennant follows the prior trend
-                if current_price > prices[-10]:  # Check if uptrend
-                    process_pattern('pennant', 'bullish')
-                else:
-                    process_pattern('pennant', 'bearish')
-            # Generate insight if signals are strong enough
             # Log signal strengths for debugging
-            algorithm.Debug(f"{symbol}: Bullish={bullish_signals:.2f}, Bearish={bearish_signals:.2f}")
-
-            # Calculate signal difference and required threshold
-            signal_difference = abs(bullish_signals - bearish_signals)
-            min_threshold = 1.0  # Minimum difference to generate a signal
-
-            if bullish_signals > bearish_signals and signal_difference >= min_threshold:
-                # Calculate magnitude based on price distances
-                magnitude = min(abs(resistance - current_price) / current_price,
-                             abs(upper_trendline[-1] - current_price) / current_price)
-
-                # Scale confidence by signal strength difference
-                adjusted_confidence = min(confidence * (signal_difference / 5.0), 1.0)
-
-                # Create insight
-                insights.append(Insight.Price(
-                    symbol, timedelta(days=1), InsightDirection.Up,
-                    magnitude, adjusted_confidence, sourceModel="TechnicalIndicatorAlphaModel"))
-
-                # Log which signals triggered this insight
-                algorithm.Debug(f"{symbol} BULLISH signals: {', '.join(triggered_bullish)}")
+            algorithm.Debug(f"{symbol}: Bullish={score.bullish_signals:.2f}, Bearish={score.bearish_signals:.2f}")
 
-            elif bearish_signals > bullish_signals and signal_difference >= min_threshold:
-                # Calculate magnitude based on price distances
-                magnitude = min(abs(support - current_price) / current_price,
-                             abs(lower_trendline[-1] - current_price) / current_price)
+            if score.direction == 0:
+                continue
 
-                # Scale confidence by signal strength difference
-                adjusted_confidence = min(confidence * (signal_difference / 5.0), 1.0)
+            # Only emit when the signal differs from the insight already active for this symbol
+            if not self.insight_coalescer.should_emit(symbol_id, algorithm.Time, score.direction,
+                                                      score.magnitude, score.confidence):
+                continue
 
-                # Create insight
-                insights.append(Insight.Price(
-                    symbol, timedelta(days=1), InsightDirection.Down,
-                    magnitude, adjusted_confidence, sourceModel="TechnicalIndicatorAlphaModel"))
+            direction = InsightDirection.Up if score.direction > 0 else InsightDirection.Down
+            insight = Insight.Price(symbol, self.insightPeriod, direction,
+                                    score.magnitude, score.confidence, sourceModel="TechnicalIndicatorAlphaModel")
+            previous = self.insight_coalescer.replace(symbol_id, algorithm.Time, score.direction,
+                                                      score.magnitude, score.confidence, insight)
+            if previous is not None:
+                # Cancel the superseded insight so only one stays active per symbol
+                algorithm.Insights.Cancel([previous])
+            insights.append(insight)
+
+            # Log which signals triggered this insight
+            if score.direction > 0:
+                algorithm.Debug(f"{symbol} BULLISH signals: {', '.join(score.triggered_bullish)}")
+            else:
+                algorithm.Debug(f"{symbol} BEARISH signals: {', '.join(score.triggered_bearish)}")
 
-                # Log which signals triggered this insight
-                algorithm.Debug(f"{symbol} BEARISH signals: {', '.join(triggered_bearish)}")
-                    
         return insights
+
+    def run_scheduled(self, algorithm):
+        """Evaluate pending symbols in priority order within the scheduler's time budget"""
+        time = algorithm.Time
+        tasks = []
+        for symbol_id, symbolData in self.symbolData.items():
+            # Buffered symbols score the still open bar, so they are due whenever new raw bars arrived
+            if symbolData.pending is None and self.buffered and symbolData.has_new_bars:
+                symbolData.pending = time
+            if symbolData.pending is None:
+                continue
+            held = algorithm.Portfolio[symbolData.symbol].Invested
+            score = symbolData.score
+            strength = 0 if score is None else abs(score.bullish_signals - score.bearish_signals)
+            since = symbolData.last_evaluated if symbolData.last_evaluated is not None else symbolData.pending
+            waited = (time - since) / self.rebalancingPeriod
+            tasks.append((symbol_id, self.scheduler.priority(held, strength, waited),
+                          symbolData.pending, symbolData.run))
+
+        _, deferred = self.scheduler.run(tasks, time)
+        if deferred:
+            algorithm.Debug(f"Deferred {len(deferred)} of {len(tasks)} symbol evaluations, "
+                            f"lateness={self.scheduler.last_lateness:.1f}s, "
+                            f"total deferrals={self.scheduler.total_deferrals}")
         
+    def bind(self, algorithm):
+        """Resolve the registries shared by the models of the algorithm"""
+        if self.market_state is None:
+            self.market_state = MarketStateRegistry.default(algorithm)
+        if self.symbol_registry is None:
+            self.symbol_registry = SymbolRegistry.default(algorithm)
+
     def OnSecuritiesChanged(self, algorithm, changes):
+        self.bind(algorithm)
         for removed in changes.RemovedSecurities:
-            if removed.Symbol in self.symbolData:
-                consolidator = self.symbolData[removed.Symbol].consolidator
-                algorithm.SubscriptionManager.RemoveConsolidator(removed.Symbol, consolidator)
-                del self.symbolData[removed.Symbol]
+            symbol_id = self.symbol_registry.id_of(removed.Symbol)
+            if symbol_id is None or symbol_id not in self.symbolData:
+                continue
+            self.symbolData.pop(symbol_id).dispose()
+            self.insight_coalescer.remove(symbol_id)
+            if self.scheduler is not None:
+                self.scheduler.remove(symbol_id)
 
         for added in changes.AddedSecurities:
-            if added.Symbol not in self.symbolData:
-                self.symbolData[added.Symbol] = self.SymbolData(algorithm, added.Symbol) 
\ No newline at end of file
+            symbol_id = self.symbol_registry.acquire(added.Symbol)
+            if symbol_id in self.symbolData:
+                continue
+            self.symbolData[symbol_id] = self.SymbolData(algorithm, added.Symbol, symbol_id, self.indicator_strength,
+                                                         self.market_state, self.timeframe, self.buffered,
+                                                         self.min_threshold,
+                                                         self.scheduler is not None and algorithm.LiveMode)
@@ -1,14 +1,21 @@
 from datetime import timedelta
+from functools import partial
+import numpy as np
 from QuantConnect.Algorithm.Framework.Portfolio import PortfolioConstructionModel as PCM
 from QuantConnect.Algorithm.Framework.Portfolio import PortfolioTarget
 from QuantConnect.Algorithm.Framework.Alphas import InsightDirection
 
+from models.aplha_models.market_state import MarketStateRegistry
+from models.portfolio_construction.streaming_covariance import StreamingCovariance
+from models.symbol_registry import SymbolRegistry
+
 class PortfolioConstructionModel(PCM):
     """
     Portfolio construction model that uses indicator strength to help determine position sizing
     """
 
-    def __init__(self, rebalance_period=timedelta(days=1), max_turnover=0.1, max_weight=0.25):
+    def __init__(self, rebalance_period=timedelta(days=1), max_turnover=0.1, max_weight=0.25, covariance=None,
+                 symbol_registry=None, market_state=None):
         """
         Initialize the portfolio construction model
 
@@ -16,6 +23,12 @@ class PortfolioConstructionModel(PCM):
         rebalance_period (timedelta): Period between portfolio rebalances
         max_turnover (float): Maximum turnover per rebalance (0.1 = 10%)
         max_weight (float): Maximum weight for any single position
+        covariance (StreamingCovariance): Estimator used for volatility/correlation-adjusted sizing
+        symbol_registry (SymbolRegistry): Interns symbols as integer ids; holdings, convictions and the
+            covariance estimator are keyed by id, Symbols are only used to emit targets; defaults to the
+            one of the algorithm
+        market_state (MarketStateRegistry): Registry of shared hourly bars feeding the covariance estimator;
+            defaults to the one of the algorithm, so no consolidator is added next to the alpha model's
         """
         super().__init__()
         self.rebalance_period = rebalance_period
@@ -24,32 +37,50 @@ class PortfolioConstructionModel(PCM):
         self.next_rebalance = None
         self.previous_targets = {}
 
+        # Use provided covariance estimator or create a new one, fed from hourly bars
+        self.covariance = covariance if covariance is not None else StreamingCovariance()
+
+        # Use provided registries or the ones of the algorithm, resolved once it is known
+        self.market_state = market_state
+        self.symbol_registry = symbol_registry
+        self.states = {}  # {symbol id: (MarketState, listener)}
+
     def CreateTargets(self, algorithm, insights):
         """Create portfolio targets based on insights"""
-        # Skip if no insights or not time to rebalance
-        if not insights or (self.next_rebalance is not None and algorithm.Time < self.next_rebalance):
+        self.bind(algorithm)
+        # Skip if not time to rebalance
+        if self.next_rebalance is not None and algorithm.Time < self.next_rebalance:
             return []
 
         self.next_rebalance = algorithm.Time + self.rebalance_period
 
-        # Get current portfolio holdings
-        current_holdings = {}
-        for kvp in algorithm.Portfolio:
-            if kvp.Value.Invested:
-                current_holdings[kvp.Key] = kvp.Value.HoldingsValue / algorithm.Portfolio.TotalPortfolioValue
+        # Size from every active insight: alpha models only re-emit a symbol's insight when its
+        # signal changes, so the insights of this step alone are a partial view of the signal set
+        insights = self.get_active_insights(algorithm, insights)
+        if not insights:
+            return []
 
         # Group insights by symbol and direction
+        registry = self.symbol_registry
         symbol_insights = {}
         for insight in insights:
-            symbol_insights.setdefault(insight.Symbol, [])
-            symbol_insights[insight.Symbol].append(insight)
+            symbol_id = registry.acquire(insight.Symbol)
+            symbol_insights.setdefault(symbol_id, [])
+            symbol_insights[symbol_id].append(insight)
+
+        # Get current portfolio holdings, indexed by symbol id; only symbols with insights can get targets
+        current_holdings = np.zeros(registry.capacity)
+        for kvp in algorithm.Portfolio:
+            if kvp.Value.Invested:
+                symbol_id = registry.id_of(kvp.Key)
+                if symbol_id is not None:
+                    current_holdings[symbol_id] = kvp.Value.HoldingsValue / algorithm.Portfolio.TotalPortfolioValue
 
         # Create new targets considering alpha strength
         new_targets = {}
-        total_conviction = 0
 
         # First pass - calculate raw conviction scores
-        for symbol, symbol_insights_list in symbol_insights.items():
+        for symbol_id, symbol_insights_list in symbol_insights.items():
             # Calculate net conviction
             net_conviction = 0
             for insight in symbol_insights_list:
@@ -57,52 +88,77 @@ class PortfolioConstructionModel(PCM):
                 direction_multiplier = 1 if insight.Direction == InsightDirection.Up else -1
                 net_conviction += direction_multiplier * insight.Confidence * insight.Magnitude
 
-            # Store absolute conviction for weighting
+            # Store with direction information preserved
             if net_conviction != 0:
-                # Store with direction information preserved
-                new_targets[symbol] = net_conviction
-                total_conviction += abs(net_conviction)
+                new_targets[symbol_id] = net_conviction
+
+        # Scale down volatile coins and coins that move together with others
+        new_targets = self.covariance.risk_adjusted_convictions(new_targets)
+        total_conviction = sum(abs(conviction) for conviction in new_targets.values())
 
         # Second pass - normalize targets
-        portfolio_targets = []
+        target_weights = []
         if total_conviction > 0:
-            for symbol, conviction in new_targets.items():
+            for symbol_id, conviction in new_targets.items():
                 # Calculate target percentage (preserve direction with sign)
                 direction = 1 if conviction > 0 else -1
                 weight = direction * min(self.max_weight, abs(conviction) / total_conviction)
-
-                # Create portfolio target
-                portfolio_targets.append(PortfolioTarget(symbol, weight))
+                target_weights.append((symbol_id, weight))
 
         # Apply turnover constraint
-        constrained_targets = self.apply_turnover_constraint(algorithm, current_holdings, portfolio_targets)
+        constrained_targets = self.apply_turnover_constraint(algorithm, current_holdings, target_weights)
 
         # Update previous targets
         self.previous_targets = {target.Symbol: target.Quantity for target in constrained_targets}
 
         return constrained_targets
 
+    def get_active_insights(self, algorithm, insights):
+        """Active insights of all alpha models, including the ones emitted on this step
+
+        Parameters:
+        algorithm (QCAlgorithm): The algorithm instance
+        insights (list): Insights emitted on this step
+
+        Returns:
+        list: Active insights, one entry per insight id
+        """
+        active = {}
+        for insight in list(algorithm.Insights.GetActiveInsights(algorithm.UtcTime)) + list(insights):
+            if insight.IsActive(algorithm.UtcTime):
+                active[insight.Id] = insight
+        return list(active.values())
+
     def apply_turnover_constraint(self, algorithm, current_holdings, targets):
-        """Apply turnover constraint to limit portfolio changes"""
+        """Apply turnover constraint to limit portfolio changes
+
+        Parameters:
+        algorithm (QCAlgorithm): The algorithm instance
+        current_holdings (np.ndarray): Current portfolio weights indexed by symbol id
+        targets (list): (symbol id, target weight) pairs
+
+        Returns:
+        list: PortfolioTarget objects
+        """
+        symbol_of = self.symbol_registry.symbol_of
+
         # Calculate turnover for proposed targets
         total_turnover = 0
-        for target in targets:
-            current_weight = current_holdings.get(target.Symbol, 0)
-            target_weight = target.Quantity
+        for symbol_id, target_weight in targets:
+            current_weight = current_holdings[symbol_id]
             turnover = abs(target_weight - current_weight)
             total_turnover += turnover
 
         # If turnover is acceptable, return original targets
         if total_turnover <= self.max_turnover:
-            return targets
+            return [PortfolioTarget(symbol_of(symbol_id), weight) for symbol_id, weight in targets]
 
         # Otherwise, scale back targets to meet turnover constraint
         scaling_factor = self.max_turnover / total_turnover
         constrained_targets = []
 
-        for target in targets:
-            current_weight = current_holdings.get(target.Symbol, 0)
-            target_weight = target.Quantity
+        for symbol_id, target_weight in targets:
+            current_weight = current_holdings[symbol_id]
 
             # Scale the weight change
             weight_change = (target_weight - current_weight) * scaling_factor
@@ -110,6 +166,38 @@ class PortfolioConstructionModel(PCM):
 
             # Only create targets that result in actual changes
             if abs(new_weight - current_weight) > 0.001:
-                constrained_targets.append(PortfolioTarget(target.Symbol, new_weight))
+                constrained_targets.append(PortfolioTarget(symbol_of(symbol_id), new_weight))
 
         return constrained_targets
+
+    def bind(self, algorithm):
+        """Resolve the registries shared by the models of the algorithm"""
+        if self.market_state is None:
+            self.market_state = MarketStateRegistry.default(algorithm)
+        if self.symbol_registry is None:
+            self.symbol_registry = SymbolRegistry.default(algorithm)
+
+    def OnSecuritiesChanged(self, algorithm, changes):
+        """Track added securities in the covariance estimator and drop removed ones"""
+        self.bind(algorithm)
+        for removed in changes.RemovedSecurities:
+            symbol_id = self.symbol_registry.id_of(removed.Symbol)
+            if symbol_id not in self.states:
+                continue
+            state, listener = self.states.pop(symbol_id)
+            self.market_state.release(algorithm, state, listener)
+            self.covariance.remove_symbol(symbol_id)
+
+        for added in changes.AddedSecurities:
+            symbol_id = self.symbol_registry.acquire(added.Symbol)
+            if symbol_id in self.states:
+                continue
+            self.covariance.add_symbol(symbol_id)
+            # Listen on the hourly bars shared with the alpha model instead of adding a consolidator;
+            # the id is bound here so no Symbol is hashed per bar
+            listener = partial(self.OnDataConsolidated, symbol_id)
+            state = self.market_state.acquire(algorithm, added.Symbol, timedelta(hours=1), listener=listener)
+            self.states[symbol_id] = (state, listener)
+
+    def OnDataConsolidated(self, symbol_id, sender, bar):
+        self.covariance.update_price(symbol_id, bar.EndTime, bar.Close)
@@ -0,0 +1,168 @@
+import numpy as np
+
+
+class StreamingCovariance:
+    """
+    Exponentially weighted covariance of log returns, updated incrementally from bar closes.
+
+    Each synchronous observation (one return per tracked symbol at a bar end time) is
+    folded in with a rank-1 update, so no history is needed at rebalance time. Symbols
+    can enter and leave at any time; their slots in the matrix are reused.
+    """
+
+    def __init__(self, halflife=24*7, shrinkage=0.0, min_periods=24):
+        """
+        Initialize the estimator
+
+        Parameters:
+        halflife (float): Half-life of the exponential weights in observations (hourly bars)
+        shrinkage (float): Weight of the diagonal target when shrinking the covariance (0 = none)
+        min_periods (int): Observations a symbol needs before it is considered ready
+        """
+        self.alpha = 1 - 0.5 ** (1.0 / halflife)
+        self.shrinkage = shrinkage
+        self.min_periods = min_periods
+        self.slots = {}  # {symbol: index into the arrays}
+        self.free_slots = []
+        self.mean = np.zeros(0)
+        self.cov = np.zeros((0, 0))
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.last_prices = {}
+        self.pending_time = None
+        self.pending_returns = {}
+
+    def add_symbol(self, symbol):
+        """Start tracking a symbol"""
+        if symbol in self.slots:
+            return
+        if not self.free_slots:
+            self._grow(max(len(self.mean), 8))
+        self.slots[symbol] = self.free_slots.pop()
+
+    def remove_symbol(self, symbol):
+        """Stop tracking a symbol and release its slot"""
+        slot = self.slots.pop(symbol, None)
+        if slot is None:
+            return
+        self._reset_slot(slot)
+        self.free_slots.append(slot)
+        self.last_prices.pop(symbol, None)
+        self.pending_returns.pop(symbol, None)
+
+    def update_price(self, symbol, time, price):
+        """Feed a bar close; returns of one bar end time are applied together once time moves on
+
+        Parameters:
+        symbol (Symbol): The asset symbol
+        time (datetime): Bar end time
+        price (float): Close price
+        """
+        if symbol not in self.slots or price <= 0:
+            return
+        if self.pending_time is not None and time > self.pending_time:
+            self.update(self.pending_returns)
+            self.pending_returns = {}
+        self.pending_time = time
+
+        last_price = self.last_prices.get(symbol)
+        self.last_prices[symbol] = price
+        if last_price is not None:
+            self.pending_returns[symbol] = np.log(price / last_price)
+
+    def update(self, returns):
+        """Fold one synchronous observation into the estimate in O(n^2)
+
+        Parameters:
+        returns (dict): {symbol: log return}; tracked symbols without a bar count as unchanged
+        """
+        if not returns:
+            return
+        x = np.zeros(len(self.mean))
+        # Symbols that have not printed a price yet stay out of the update
+        started = np.zeros(len(self.mean), dtype=bool)
+        for symbol in self.last_prices:
+            started[self.slots[symbol]] = True
+        for symbol, value in returns.items():
+            slot = self.slots.get(symbol)
+            if slot is not None:
+                x[slot] = value
+                started[slot] = True
+                self.counts[slot] += 1
+
+        delta = x - self.mean
+        delta[~started] = 0.0
+        self.mean += self.alpha * delta
+        self.cov *= (1 - self.alpha)
+        self.cov += (1 - self.alpha) * self.alpha * np.outer(delta, delta)
+
+    def is_ready(self, symbol):
+        """Check whether a symbol has enough observations to be used"""
+        slot = self.slots.get(symbol)
+        return slot is not None and self.counts[slot] >= self.min_periods
+
+    def covariance(self, symbols):
+        """Covariance matrix of the given symbols, shrunk towards its diagonal
+
+        Parameters:
+        symbols (list): Tracked symbols, in the order of the returned rows
+
+        Returns:
+        ndarray: len(symbols) x len(symbols) covariance matrix
+        """
+        index = [self.slots[symbol] for symbol in symbols]
+        cov = self.cov[np.ix_(index, index)]
+        if self.shrinkage > 0:
+            cov = (1 - self.shrinkage) * cov + self.shrinkage * np.diag(np.diag(cov))
+        return cov
+
+    def risk_adjusted_convictions(self, convictions):
+        """Scale convictions by inverse volatility and by how correlated each symbol is with the rest
+
+        A symbol moving in lockstep with k others gets roughly 1/k of the weight it would
+        get on its own. Signs are preserved. Symbols without enough observations yet get
+        the median volatility of the ready ones and no crowding penalty, so a newly added
+        coin does not switch off risk sizing for the rest.
+
+        Parameters:
+        convictions (dict): {symbol: signed conviction}
+
+        Returns:
+        dict: Adjusted convictions, or the input unchanged if no symbol is ready
+        """
+        symbols = list(convictions)
+        ready = [symbol for symbol in symbols if self.is_ready(symbol)]
+        if not ready:
+            return convictions
+
+        cov = self.covariance(ready)
+        vol = np.sqrt(np.diag(cov))
+        usable = vol > 0
+        if not np.any(usable):
+            return convictions
+        ready = [symbol for symbol, ok in zip(ready, usable) if ok]
+        cov = cov[np.ix_(usable, usable)]
+        vol = vol[usable]
+
+        correlation = cov / np.outer(vol, vol)
+        crowding = np.abs(correlation).sum(axis=1)
+        scale = dict(zip(ready, (vol * crowding).tolist()))
+        default_scale = float(np.median(vol))
+        return {symbol: conviction / scale.get(symbol, default_scale)
+                for symbol, conviction in convictions.items()}
+
+    def _grow(self, extra):
+        size = len(self.mean)
+        new_size = size + extra
+        cov = np.zeros((new_size, new_size))
+        cov[:size, :size] = self.cov
+        self.cov = cov
+        self.mean = np.concatenate([self.mean, np.zeros(extra)])
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+        # Hand out low slots first
+        self.free_slots.extend(range(new_size - 1, size - 1, -1))
+
+    def _reset_slot(self, slot):
+        self.mean[slot] = 0.0
+        self.counts[slot] = 0
+        self.cov[slot, :] = 0.0
+        self.cov[:, slot] = 0.0
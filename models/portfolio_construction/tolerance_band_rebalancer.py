@@ -0,0 +1,50 @@
+import numpy as np
+
+
+class ToleranceBandRebalancer:
+    """
+    Diff-based rebalancer that only trades positions which drifted outside a tolerance band.
+
+    Target and live weights are compared in one vectorized step. Symbols whose weight
+    moved less than the drift band, or whose order would be smaller than the minimum
+    notional, are left alone. Liquidations are always kept and ordered before entries;
+    new positions are only gated by the minimum notional.
+    """
+
+    def __init__(self, drift_band=0.02, min_notional=10.0):
+        """
+        Initialize the rebalancer
+
+        Parameters:
+        drift_band (float): Absolute weight drift tolerated before trading (0.02 = 2% of portfolio)
+        min_notional (float): Minimum order value in account currency
+        """
+        self.drift_band = drift_band
+        self.min_notional = min_notional
+
+    def rebalance(self, target_weights, current_weights, portfolio_value):
+        """Compute the targets that have to be submitted
+
+        Parameters:
+        target_weights (dict): {symbol: weight} desired portfolio; held symbols missing here are liquidated
+        current_weights (dict): {symbol: weight} live holdings as a fraction of portfolio value
+        portfolio_value (float): Total portfolio value
+
+        Returns:
+        list: (symbol, weight) pairs, liquidations first, then entries and adjustments
+        """
+        symbols = list(dict.fromkeys([*target_weights, *current_weights]))
+        if not symbols:
+            return []
+
+        target = np.array([target_weights.get(symbol, 0.0) for symbol in symbols], dtype=float)
+        current = np.array([current_weights.get(symbol, 0.0) for symbol in symbols], dtype=float)
+
+        drift = np.abs(target - current)
+        liquidate = (target == 0) & (current != 0)
+        # A target at or below the drift band would otherwise never be entered
+        enter = (current == 0) & (target != 0) & (drift * portfolio_value >= self.min_notional)
+        adjust = ~liquidate & (enter | ((drift > self.drift_band) & (drift * portfolio_value >= self.min_notional)))
+
+        return ([(symbols[i], 0.0) for i in np.flatnonzero(liquidate)] +
+                [(symbols[i], float(target[i])) for i in np.flatnonzero(adjust)])
@@ -0,0 +1,59 @@
+class SymbolRegistry:
+    """
+    Interns Symbol objects as dense integer ids.
+
+    Hashing and comparing pythonnet Symbol objects crosses the .NET boundary, so models
+    look a Symbol up once when a security is added and key their internal state by the
+    integer id. A Symbol keeps its id for the life of the registry, also after it left
+    the universe, so state recorded under the id (indicator statistics, holdings) stays
+    valid when the coin comes back. Components that size arrays by active symbols reuse
+    their own slots instead (see StreamingCovariance).
+    """
+
+    # Attribute of the algorithm instance holding its default registry
+    ALGORITHM_ATTRIBUTE = '_symbol_registry'
+
+    def __init__(self):
+        self.ids = {}  # {Symbol: id}
+        self.symbols = []  # id -> Symbol
+
+    @classmethod
+    def default(cls, algorithm):
+        """The registry shared by the alpha, strength tracker and portfolio models of one algorithm
+
+        It is stored on the algorithm instance, so another algorithm or QuantBook in the
+        same process gets its own ids.
+        """
+        registry = getattr(algorithm, cls.ALGORITHM_ATTRIBUTE, None)
+        if registry is None:
+            registry = cls()
+            setattr(algorithm, cls.ALGORITHM_ATTRIBUTE, registry)
+        return registry
+
+    @property
+    def capacity(self):
+        """Upper bound of the ids handed out so far, for sizing id-indexed arrays"""
+        return len(self.symbols)
+
+    def acquire(self, symbol):
+        """Get the id of a symbol, assigning one if it has none
+
+        Parameters:
+        symbol (Symbol): The asset symbol
+
+        Returns:
+        int: The interned id
+        """
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return symbol_id
+
+    def id_of(self, symbol):
+        """Return the id of a registered symbol, or None"""
+        return self.ids.get(symbol)
+
+    def symbol_of(self, symbol_id):
+        """Return the Symbol behind an id"""
+        return self.symbols[symbol_id]
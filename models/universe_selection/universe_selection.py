@@ -1,43 +1,49 @@
-from AlgorithmImports import *
 import numpy as np
 from datetime import timedelta
+from QuantConnect import Resolution
+from QuantConnect.Data.Fundamental import Fundamental
+from QuantConnect.Data.UniverseSelection import Universe
 
 class VolumeVolatilityUniverseSelectionModel:
     """
     Universe selection model that selects top cryptocurrency pairs by volume and volatility.
     First, it filters the top 50 trading pairs with USDC by trading volume.
     Then, it selects the top 10 most volatile pairs among those.
+
+    Register it with a selector that passes the algorithm, e.g.
+    algorithm.add_universe(lambda fundamental: model.filter(algorithm, fundamental))
     """
 
-    def __init__(self, lookback_days=30):
+    def __init__(self, lookback_days=30, history_cache=None):
         """
         Initialize the universe selection model
 
         Parameters:
         lookback_days (int): Number of days to look back for volume and volatility calculations
+        history_cache (HistoryCache): Optional on-disk cache for the daily history requests
         """
         self.lookback_days = lookback_days
+        self.history_cache = history_cache
         self.usdc_pair_filter = "USDC"
         self.top_by_volume = 50
         self.top_by_volatility = 10
         self.next_refresh_time = None
         self.refresh_period = timedelta(days=1)  # Refresh universe daily
 
-    def filter(self, fundamental: list[Fundamental]):
-    #def filter_coarse(self, algorithm, coarse):
+    def filter(self, algorithm, coarse: list[Fundamental]):
         """
         Filters the universe to find the top cryptocurrency pairs by volume and volatility
 
         Parameters:
         algorithm (QCAlgorithm): The algorithm instance
-        coarse (list): List of CoarseFundamental objects
+        coarse (list): List of Fundamental objects
 
         Returns:
         list: List of Symbol objects representing the selected universe
         """
         # Check if it's time to refresh the universe
         if self.next_refresh_time is not None and algorithm.Time < self.next_refresh_time:
-            return algorithm.Universe.Unchanged
+            return Universe.Unchanged
 
         self.next_refresh_time = algorithm.Time + self.refresh_period
 
@@ -62,7 +68,11 @@ class VolumeVolatilityUniverseSelectionModel:
         for coin in by_volume:
             try:
                 # Get historical data for volatility calculation
-                history = algorithm.History([coin.Symbol], lookback, Resolution.Daily)
+                if self.history_cache is not None:
+                    history = self.history_cache.history(algorithm, coin.Symbol, history_start,
+                                                         algorithm.Time, Resolution.Daily)
+                else:
+                    history = algorithm.History([coin.Symbol], lookback, Resolution.Daily)
 
                 if history.empty or len(history) < 7:  # Require at least a week of data
                     continue
@@ -0,0 +1,14 @@
+"""
+Offline execution of the strategy logic outside a LEAN runtime
+"""
+
+from .aggregation_benchmark import measure_aggregation_throughput
+from .sharded_runner import SharedBars, ShardedRunResult, partition_symbols, run_sharded
+
+__all__ = [
+    'measure_aggregation_throughput',
+    'SharedBars',
+    'ShardedRunResult',
+    'partition_symbols',
+    'run_sharded'
+]
@@ -0,0 +1,49 @@
+import time
+
+import numpy as np
+
+from models.aplha_models.bar_buffer import BarBuffer
+
+
+def measure_aggregation_throughput(symbols=100, bars=10080, resolution=60, timeframe=3600, flush_every=60, seed=0):
+    """
+    Measure single-core ingestion and aggregation throughput of BarBuffer
+
+    Raw bars are appended one at a time, as the alpha model does in Update, and flushed
+    every `flush_every` bars. The result is comparable across machines in bars per
+    second per core.
+
+    Parameters:
+    symbols (int): Number of symbols, each with its own buffer
+    bars (int): Raw bars per symbol (default: one week of minute bars)
+    resolution (int): Raw bar length in seconds
+    timeframe (int): Aggregated bar length in seconds
+    flush_every (int): Number of raw bars between flushes
+    seed (int): Random seed of the synthetic prices
+
+    Returns:
+    dict: Total raw bars, elapsed seconds and bars per second
+    """
+    rng = np.random.default_rng(seed)
+    times = np.arange(bars) * float(resolution)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    opens = np.concatenate(([closes[0]], closes[:-1]))
+    highs = np.maximum(opens, closes) * 1.001
+    lows = np.minimum(opens, closes) * 0.999
+    volumes = rng.uniform(0, 10, bars)
+    rows = list(zip(times.tolist(), opens.tolist(), highs.tolist(), lows.tolist(),
+                    closes.tolist(), volumes.tolist()))
+
+    buffers = [BarBuffer(timeframe) for _ in range(symbols)]
+    start = time.perf_counter()
+    for i, row in enumerate(rows):
+        for buffer in buffers:
+            buffer.append(*row)
+        if (i + 1) % flush_every == 0:
+            now = row[0] + resolution
+            for buffer in buffers:
+                buffer.flush(now)
+    elapsed = time.perf_counter() - start
+
+    total = symbols * bars
+    return {'bars': total, 'seconds': elapsed, 'bars_per_second': total / elapsed}
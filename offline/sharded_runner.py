@@ -0,0 +1,214 @@
+import os
+import multiprocessing
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from indicators.indicator_strength import IndicatorStrength
+from indicators.signal_scoring import iter_features, score_features
+
+# Row order of the shared bar matrix
+BAR_FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+EPOCH = datetime(1970, 1, 1)
+
+# Shared bar matrix attached once per worker process
+_worker_bars = None
+_worker_shm = None
+
+
+class SharedBars:
+    """
+    Bars of many symbols packed into one shared memory block.
+
+    The block holds a float64 matrix with one row per field in BAR_FIELDS and the
+    bars of every symbol laid out back to back; symbol i owns the columns
+    offsets[i]:offsets[i+1]. Times are seconds since the epoch.
+    """
+
+    def __init__(self, bars):
+        """
+        Copy bar arrays into a new shared memory block
+
+        Parameters:
+        bars (dict): {symbol: {field: array}} with the fields in BAR_FIELDS, oldest bar first
+        """
+        self.symbols = list(bars.keys())
+        lengths = [len(bars[symbol]['close']) for symbol in self.symbols]
+        self.offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+
+        shape = (len(BAR_FIELDS), int(self.offsets[-1]))
+        nbytes = max(int(np.prod(shape)) * np.dtype(np.float64).itemsize, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.array = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+        for i, symbol in enumerate(self.symbols):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            for row, field in enumerate(BAR_FIELDS):
+                self.array[row, start:end] = bars[symbol][field]
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    def close(self):
+        """Release the block; must be called by the creating process"""
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ShardedRunResult:
+    """Merged output of a sharded run"""
+
+    def __init__(self, insights, indicator_strength):
+        self.insights = insights
+        self.indicator_strength = indicator_strength
+
+
+def _attach_shared_bars(name, shape):
+    """Pool initializer: map the shared bar matrix into the worker without copying"""
+    global _worker_bars, _worker_shm
+    try:
+        # Python 3.13+: do not let the worker's resource tracker unlink the block
+        _worker_shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_bars = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+
+
+def _run_symbol(bars, symbol, start, end, window, lookback_period, min_threshold, feature_store=None):
+    """
+    Replay one symbol bar by bar with its own IndicatorStrength
+
+    Every symbol is scored in isolation, so the outcome does not depend on which
+    shard it lands in or on which symbols were processed before it.
+    """
+    strength = IndicatorStrength(lookback_period=lookback_period)
+    series = {field: bars[row, start:end] for row, field in enumerate(BAR_FIELDS)}
+    times = series['time'][window - 1:]
+
+    if feature_store is not None:
+        # Indicator outputs come from the store; only the scoring stage runs
+        table = feature_store.get(series, window)
+        rows = (table.row(j) for j in range(len(table)))
+    else:
+        rows = iter_features(series['open'], series['high'], series['low'], series['close'],
+                             series['volume'], window)
+
+    insights = []
+    for bar_time, values in zip(times, rows):
+        timestamp = EPOCH + timedelta(seconds=float(bar_time))
+        score = score_features(strength, timestamp, symbol, values, min_threshold)
+        if score.direction != 0:
+            insights.append({
+                'timestamp': timestamp,
+                'symbol': symbol,
+                'direction': score.direction,
+                'magnitude': score.magnitude,
+                'confidence': score.confidence
+            })
+
+    return insights, dict(strength.asset_indicators), strength.signals
+
+
+def _run_shard(task, bars=None):
+    """Worker entry point: score every symbol of one shard"""
+    shard, offsets, window, lookback_period, min_threshold, feature_store = task
+    bars = _worker_bars if bars is None else bars
+    return [(index, _run_symbol(bars, symbol, offsets[index], offsets[index + 1],
+                                window, lookback_period, min_threshold, feature_store))
+            for index, symbol in shard]
+
+
+def partition_symbols(offsets, symbols, workers):
+    """
+    Split symbols into shards with roughly equal bar counts
+
+    Parameters:
+    offsets (array): Column offsets of each symbol in the shared bar matrix
+    symbols (list): Symbols in input order
+    workers (int): Number of shards to create
+
+    Returns:
+    list: One list of (index, symbol) pairs per non-empty shard
+    """
+    lengths = np.diff(offsets)
+    shards = [[] for _ in range(workers)]
+    loads = [0] * workers
+    # Longest processing time first; ties are broken by input order to stay deterministic
+    for index in sorted(range(len(symbols)), key=lambda i: (-lengths[i], i)):
+        target = loads.index(min(loads))
+        shards[target].append((index, symbols[index]))
+        loads[target] += int(lengths[index])
+    return [shard for shard in shards if shard]
+
+
+def _merge(symbols, results, lookback_period):
+    """Merge per-symbol results in input order so the output is independent of sharding"""
+    order = {symbol: index for index, symbol in enumerate(symbols)}
+    strength = IndicatorStrength(lookback_period=lookback_period)
+    insights = []
+    signals = []
+    for index in range(len(symbols)):
+        symbol_insights, asset_indicators, symbol_signals = results[index]
+        insights.extend(symbol_insights)
+        signals.extend(symbol_signals)
+        strength.asset_indicators.update(asset_indicators)
+
+    insights.sort(key=lambda x: (x['timestamp'], order[x['symbol']]))
+    signals.sort(key=lambda s: (s['timestamp'], order[s['symbol']]))
+
+    # Apply the lookback cutoff a single-process run would apply at the last signal time
+    if signals:
+        cutoff_time = signals[-1]['timestamp'] - timedelta(hours=lookback_period)
+        signals = [s for s in signals if s['timestamp'] > cutoff_time]
+    strength.signals = signals
+    return ShardedRunResult(insights, strength)
+
+
+def run_sharded(bars, workers=None, window=200, lookback_period=30*24, min_threshold=1.0, mp_context=None,
+                feature_store=None):
+    """
+    Score a symbol universe offline, partitioning symbols across worker processes
+
+    Bars are placed in a shared memory block which the workers map instead of
+    receiving pickled copies. Results are merged in input symbol order, so the
+    output is identical for any number of workers.
+
+    Parameters:
+    bars (dict): {symbol: {field: array}} with the fields in BAR_FIELDS, oldest bar first
+    workers (int): Number of worker processes (default: os.cpu_count(); 1 runs in-process)
+    window (int): Number of bars scored at each step, as held by the alpha model's rolling window
+    lookback_period (int): IndicatorStrength lookback in hours
+    min_threshold (float): Minimum bullish/bearish difference to generate a signal
+    mp_context (str): Multiprocessing start method (default: platform default)
+    feature_store (FeatureStore): Reuse stored indicator outputs, so repeated runs that only change
+        lookback_period or min_threshold skip the indicator computation
+
+    Returns:
+    ShardedRunResult: Insights sorted by time and symbol, and the merged IndicatorStrength
+    """
+    workers = workers or os.cpu_count() or 1
+    shared = SharedBars(bars)
+    try:
+        shards = partition_symbols(shared.offsets, shared.symbols, min(workers, max(len(shared.symbols), 1)))
+        offsets = shared.offsets.tolist()
+        tasks = [(shard, offsets, window, lookback_period, min_threshold, feature_store) for shard in shards]
+
+        if workers == 1 or len(shards) <= 1:
+            shard_results = [_run_shard(task, shared.array) for task in tasks]
+        else:
+            context = multiprocessing.get_context(mp_context)
+            with context.Pool(len(shards), initializer=_attach_shared_bars,
+                              initargs=(shared.shm.name, shared.shape)) as pool:
+                shard_results = pool.map(_run_shard, tasks)
+    finally:
+        shared.close()
+
+    results = {}
+    for shard_result in shard_results:
+        for index, result in shard_result:
+            results[index] = result
+    return _merge(shared.symbols, results, lookback_period)
+
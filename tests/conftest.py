@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+
+def synthetic_bars(symbols=4, length=260, stagger=23, seed=0, start=1.6e9):
+    """Synthetic hourly bars; with a stagger, symbol lengths differ so shards are not balanced by count"""
+    rng = np.random.default_rng(seed)
+    bars = {}
+    for i in range(symbols):
+        n = length + stagger * i
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        opens = np.concatenate(([closes[0]], closes[:-1]))
+        bars[f"COIN{i}"] = {
+            'time': start + 3600.0 * np.arange(n),
+            'open': opens,
+            'high': np.maximum(opens, closes) * (1 + rng.uniform(0, 0.01, n)),
+            'low': np.minimum(opens, closes) * (1 - rng.uniform(0, 0.01, n)),
+            'close': closes,
+            'volume': rng.uniform(1, 100, n),
+        }
+    return bars
+
+
+@pytest.fixture
+def make_bars():
+    return synthetic_bars
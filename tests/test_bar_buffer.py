@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from models.aplha_models.bar_buffer import BarBuffer
+
+
+def make_minute_bars(hours=60, seed=0):
+    """Synthetic minute bars with random missing minutes and a few fully missing hours"""
+    rng = np.random.default_rng(seed)
+    times = 1.6e9 + 60.0 * np.arange(hours * 60)
+    keep = rng.uniform(size=len(times)) > 0.3
+    for hour in (5, 17, 18, 40):
+        keep[hour * 60:(hour + 1) * 60] = False
+    times = times[keep]
+    n = len(times)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    opens = np.concatenate(([closes[0]], closes[:-1]))
+    return pd.DataFrame({
+        'open': opens,
+        'high': np.maximum(opens, closes) * (1 + rng.uniform(0, 0.001, n)),
+        'low': np.minimum(opens, closes) * (1 - rng.uniform(0, 0.001, n)),
+        'close': closes,
+        'volume': rng.uniform(0, 10, n),
+    }, index=pd.to_datetime(times, unit='s'))
+
+
+def resample(minutes):
+    hourly = minutes.resample('1h').agg({'open': 'first', 'high': 'max', 'low': 'min',
+                                         'close': 'last', 'volume': 'sum'})
+    return hourly.dropna(subset=['open'])
+
+
+def ingest(buffer, minutes, flush_every=45):
+    seconds = minutes.index.values.astype('datetime64[s]').astype(np.int64).astype(float)
+    rows = minutes[['open', 'high', 'low', 'close', 'volume']].to_numpy()
+    for i, (time, row) in enumerate(zip(seconds, rows)):
+        buffer.append(time, *row)
+        if (i + 1) % flush_every == 0:
+            buffer.flush(time + 60)
+    return seconds
+
+
+def assert_matches(arrays, expected):
+    for values, column in zip(arrays, ('open', 'high', 'low', 'close', 'volume')):
+        np.testing.assert_allclose(values, expected[column].to_numpy(), rtol=0, atol=1e-9)
+
+
+def test_aggregation_matches_hourly_resample_with_gaps():
+    minutes = make_minute_bars()
+    buffer = BarBuffer(3600, window=30)
+    seconds = ingest(buffer, minutes)
+    buffer.flush((np.floor(seconds[-1] / 3600) + 1) * 3600)
+
+    assert buffer.bars_ingested == len(minutes)
+    assert_matches(buffer.get_arrays(), resample(minutes).iloc[-30:])
+
+
+def test_partial_bar_matches_resample_of_the_open_hour():
+    minutes = make_minute_bars()
+    # Stop in the middle of the last hour
+    minutes = minutes.iloc[:-20]
+    buffer = BarBuffer(3600, window=30)
+    seconds = ingest(buffer, minutes)
+    buffer.flush(seconds[-1] + 60)
+
+    assert_matches(buffer.get_arrays(include_partial=True), resample(minutes).iloc[-30:])
@@ -0,0 +1,83 @@
+from collections import Counter
+
+import numpy as np
+
+from indicators.candlestick_patterns import detect_chart_patterns
+from indicators.pattern_features import PatternFeatures
+
+CHART_PATTERNS = ('head_and_shoulders', 'bull_flag', 'ascending_triangle', 'descending_triangle',
+                  'rising_wedge', 'falling_wedge', 'cup_and_handle', 'megaphone', 'pennant')
+
+
+def scan_chart_patterns(highs, lows):
+    """The original window scans that PatternFeatures replaces"""
+    patterns = {}
+    left_shoulder = max(highs[-20:-15])
+    head = max(highs[-15:-10])
+    right_shoulder = max(highs[-10:-5])
+    if head > left_shoulder and head > right_shoulder and \
+       abs(left_shoulder - right_shoulder)/left_shoulder < 0.02:
+        patterns['head_and_shoulders'] = True
+    if all(highs[i] < highs[i-1] for i in range(-1, -6, -1)) and \
+       all(lows[i] < lows[i-1] for i in range(-1, -6, -1)):
+        patterns['bull_flag'] = True
+    resistance = max(highs[-20:])
+    if all(lows[i] > lows[i-1] for i in range(-1, -10, -1)) and \
+       all(abs(highs[i] - resistance) < 0.02 * resistance for i in range(-1, -10, -1)):
+        patterns['ascending_triangle'] = True
+    support = min(lows[-20:])
+    if all(highs[i] < highs[i-1] for i in range(-1, -10, -1)) and \
+       all(abs(lows[i] - support) < 0.02 * support for i in range(-1, -10, -1)):
+        patterns['descending_triangle'] = True
+    if all(highs[i] > highs[i-1] for i in range(-1, -10, -1)) and \
+       all(lows[i] > lows[i-1] for i in range(-1, -10, -1)):
+        patterns['rising_wedge'] = True
+    if all(highs[i] < highs[i-1] for i in range(-1, -10, -1)) and \
+       all(lows[i] < lows[i-1] for i in range(-1, -10, -1)):
+        patterns['falling_wedge'] = True
+    cup_bottom = min(lows[-20:-10])
+    if all(lows[i] > cup_bottom for i in range(-9, -1)):
+        patterns['cup_and_handle'] = True
+    if all(highs[i] > highs[i-1] for i in range(-1, -10, -1)) and \
+       all(lows[i] < lows[i-1] for i in range(-1, -10, -1)):
+        patterns['megaphone'] = True
+    if all(highs[i] < highs[i-1] for i in range(-1, -10, -1)) and \
+       all(lows[i] > lows[i-1] for i in range(-1, -10, -1)):
+        patterns['pennant'] = True
+    return patterns
+
+
+def make_series(rng, n):
+    """Highs and lows built from trending segments, so run-based patterns actually occur"""
+    high_steps, low_steps = [], []
+    while len(high_steps) < n:
+        length = int(rng.integers(3, 15))
+        high_drift, low_drift = rng.choice([-0.004, 0.0, 0.004], size=2)
+        noise = float(rng.choice([0.0005, 0.003]))
+        high_steps.extend(rng.normal(high_drift, noise, length))
+        low_steps.extend(rng.normal(low_drift, noise, length))
+    highs = 100 * np.exp(np.cumsum(high_steps[:n]))
+    lows = np.minimum(highs * 0.98, 98 * np.exp(np.cumsum(low_steps[:n])))
+    return highs, lows
+
+
+def test_rebuilt_features_match_window_scans():
+    rng = np.random.default_rng(0)
+    found = Counter()
+    for _ in range(3000):
+        highs, lows = make_series(rng, int(rng.integers(20, 60)))
+        expected = scan_chart_patterns(highs, lows)
+        assert detect_chart_patterns(PatternFeatures.from_arrays(highs, lows)) == expected
+        found.update(expected)
+    # The comparison is only meaningful if every pattern was seen
+    assert set(found) == set(CHART_PATTERNS)
+
+
+def test_incremental_features_match_window_scans():
+    rng = np.random.default_rng(1)
+    highs, lows = make_series(rng, 3000)
+    features = PatternFeatures()
+    for i in range(len(highs)):
+        features.update(highs[i], lows[i])
+        if i >= 19:
+            assert detect_chart_patterns(features) == scan_chart_patterns(highs[:i + 1], lows[:i + 1])
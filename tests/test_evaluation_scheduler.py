@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from models.aplha_models.evaluation_scheduler import EvaluationScheduler
+
+NOW = datetime(2024, 1, 1, 12)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(budget=1.0):
+    clock = FakeClock()
+    return EvaluationScheduler(budget=timedelta(seconds=budget), clock=clock), clock
+
+
+def task(symbol, priority, clock, log, cost=0.4, due=NOW):
+    def evaluate(now):
+        log.append(symbol)
+        clock.now += cost
+    return symbol, priority, due, evaluate
+
+
+def test_priority_weights():
+    scheduler = EvaluationScheduler(holding_weight=10.0, signal_weight=2.0, staleness_weight=0.5)
+    assert scheduler.priority(True, 1.5, 4) == 10.0 + 3.0 + 2.0
+    assert scheduler.priority(False, 0.0, 0) == 0.0
+
+
+def test_runs_in_priority_order_and_defers_once_the_budget_is_used():
+    scheduler, clock = make_scheduler(budget=1.0)
+    log = []
+    tasks = [task(symbol, priority, clock, log) for symbol, priority in (('a', 1), ('b', 5), ('c', 3), ('d', 4))]
+
+    completed, deferred = scheduler.run(tasks, NOW)
+    # Three evaluations of 0.4s each cross the 1s budget
+    assert log == completed == ['b', 'd', 'c']
+    assert deferred == ['a']
+    assert scheduler.deferral_counts == {'a': 1}
+    assert scheduler.total_deferrals == 1
+    assert scheduler.last_deferred == ['a']
+
+
+def test_at_least_one_evaluation_runs_per_cycle():
+    scheduler, clock = make_scheduler(budget=0.1)
+    log = []
+    completed, deferred = scheduler.run([task('a', 1, clock, log, cost=5.0), task('b', 0, clock, log)], NOW)
+    assert completed == ['a']
+    assert deferred == ['b']
+
+
+def test_deferred_symbols_are_not_starved():
+    scheduler, clock = make_scheduler(budget=0.5)
+    waited = {'held': 0, 'idle': 0}
+    for cycle in range(20):
+        log = []
+        tasks = [task(symbol, scheduler.priority(symbol == 'held', 0.0, waited[symbol]), clock, log, cost=0.6)
+                 for symbol in waited]
+        completed, deferred = scheduler.run(tasks, NOW)
+        for symbol in waited:
+            waited[symbol] = 0 if symbol in completed else waited[symbol] + 1
+        if 'idle' in completed:
+            break
+    # Waiting raises the priority of the idle symbol until it outranks the held one (weight 10)
+    assert 'idle' in completed
+    assert cycle == 11
+    assert scheduler.deferral_counts['idle'] == cycle
+    assert scheduler.cycles == cycle + 1
+
+
+def test_lateness_is_reported():
+    scheduler, clock = make_scheduler(budget=10.0)
+    log = []
+    scheduler.run([task('a', 2, clock, log, cost=0.5, due=NOW - timedelta(seconds=30)),
+                   task('b', 1, clock, log, cost=0.5, due=NOW)], NOW)
+    # a is 30s late plus its own evaluation, b waited for both evaluations
+    assert scheduler.last_lateness == 30.5
+    assert scheduler.max_lateness == 30.5
+
+    scheduler.run([task('a', 1, clock, log, cost=0.5, due=NOW)], NOW)
+    assert scheduler.last_lateness == 0.5
+    assert scheduler.max_lateness == 30.5
+
+
+def test_removed_symbols_are_forgotten():
+    scheduler, clock = make_scheduler(budget=0.1)
+    scheduler.run([task('a', 1, clock, []), task('b', 0, clock, [])], NOW)
+    scheduler.remove('b')
+    assert scheduler.deferral_counts == {}
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+
+from cache import FeatureStore
+from offline import run_sharded
+
+
+def assert_same_run(result, expected):
+    assert result.insights == expected.insights
+    assert result.indicator_strength.signals == expected.indicator_strength.signals
+
+
+def assert_same_table(table, columns):
+    assert table.columns.keys() == columns.keys()
+    for name, values in columns.items():
+        np.testing.assert_array_equal(table.columns[name], values)
+
+
+def test_stored_features_give_the_same_run(tmp_path, make_bars):
+    bars = make_bars(symbols=3, length=400, stagger=0, seed=2)
+    store = FeatureStore(str(tmp_path))
+    expected = run_sharded(bars, workers=1)
+
+    # First run computes and stores the features, the second one reads them from disk
+    assert_same_run(run_sharded(bars, workers=1, feature_store=store), expected)
+    assert os.listdir(tmp_path)
+    assert_same_run(run_sharded(bars, workers=1, feature_store=store), expected)
+    assert expected.insights
+
+
+def test_parameter_sweep_reuses_stored_features(tmp_path, make_bars):
+    bars = make_bars(symbols=3, length=250, stagger=0, seed=2)
+    store = FeatureStore(str(tmp_path))
+    run_sharded(bars, workers=1, feature_store=store)
+    entries = sorted(os.listdir(tmp_path))
+
+    for min_threshold in (0.5, 2.0):
+        expected = run_sharded(bars, workers=1, min_threshold=min_threshold)
+        assert_same_run(run_sharded(bars, workers=1, min_threshold=min_threshold, feature_store=store), expected)
+    assert sorted(os.listdir(tmp_path)) == entries
+
+
+def test_overlapping_ranges_reuse_stored_chunks(tmp_path, make_bars):
+    week = 7 * 24
+    # Start on a chunk boundary so the chunks of both ranges line up with whole weeks
+    series = make_bars(symbols=1, length=5 * week, stagger=0, seed=3, start=2600 * 7 * 24 * 3600.0)['COIN0']
+    store = FeatureStore(str(tmp_path))
+
+    shorter = {field: values[:4 * week] for field, values in series.items()}
+    assert_same_table(store.get(shorter), FeatureStore.compute(shorter))
+    stored = set(os.listdir(tmp_path))
+
+    # One more week of data only computes the new chunk
+    assert_same_table(store.get(series), FeatureStore.compute(series))
+    assert len(set(os.listdir(tmp_path)) - stored) == 1
+
+    # A later start date only recomputes its first, partial chunk
+    shifted = {field: values[week:] for field, values in series.items()}
+    before = set(os.listdir(tmp_path))
+    assert_same_table(store.get(shifted), FeatureStore.compute(shifted))
+    assert len(set(os.listdir(tmp_path)) - before) == 1
@@ -0,0 +1,130 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from cache import HistoryCache
+
+START = datetime(2024, 1, 1)
+
+
+class FakeAlgorithm:
+    """Stands in for algorithm.History: hourly bars including both ends of the range"""
+
+    def __init__(self):
+        self.requests = []
+
+    def History(self, symbols, start, end, resolution):
+        self.requests.append((start, end))
+        times = pd.date_range(start, end, freq='h')
+        index = pd.MultiIndex.from_arrays([[symbols[0]] * len(times), times], names=['symbol', 'time'])
+        return pd.DataFrame({'close': close_at(times)}, index=index)
+
+
+def nanoseconds(times):
+    return pd.DatetimeIndex(times).values.astype('datetime64[ns]').astype(np.int64)
+
+
+def close_at(times):
+    return (nanoseconds(times) // 3_600_000_000_000 % 1000).astype(float)
+
+
+def hours(n):
+    return timedelta(hours=n)
+
+
+def assert_bars(frame, start, end):
+    expected = pd.date_range(start, end, freq='h')
+    times = frame.index.get_level_values('time')
+    assert list(times) == list(expected)
+    np.testing.assert_array_equal(frame['close'].to_numpy(), close_at(expected))
+
+
+def test_only_missing_head_and_tail_are_fetched(tmp_path):
+    algorithm = FakeAlgorithm()
+    cache = HistoryCache(str(tmp_path))
+    cache.history(algorithm, 'BTCUSD', START + hours(10), START + hours(20), 'Hour')
+
+    frame = cache.history(algorithm, 'BTCUSD', START, START + hours(30), 'Hour')
+    assert algorithm.requests[1:] == [(START, START + hours(10)), (START + hours(20), START + hours(30))]
+    # Bars at the range boundaries are fetched twice but kept once
+    assert_bars(frame, START, START + hours(30))
+
+    cache.history(algorithm, 'BTCUSD', START + hours(5), START + hours(25), 'Hour')
+    assert len(algorithm.requests) == 3
+    assert cache.hits == 1
+
+
+def test_disjoint_ranges_are_kept_and_the_gap_filled(tmp_path):
+    algorithm = FakeAlgorithm()
+    cache = HistoryCache(str(tmp_path))
+    cache.history(algorithm, 'BTCUSD', START, START + hours(10), 'Hour')
+    cache.history(algorithm, 'BTCUSD', START + hours(50), START + hours(60), 'Hour')
+
+    # Both ranges are still served from disk
+    assert_bars(cache.history(algorithm, 'BTCUSD', START, START + hours(10), 'Hour'), START, START + hours(10))
+    assert_bars(cache.history(algorithm, 'BTCUSD', START + hours(50), START + hours(60), 'Hour'),
+                START + hours(50), START + hours(60))
+    assert len(algorithm.requests) == 2
+
+    # A request spanning both only fetches the gap between them
+    frame = cache.history(algorithm, 'BTCUSD', START + hours(5), START + hours(55), 'Hour')
+    assert algorithm.requests[-1] == (START + hours(10), START + hours(50))
+    assert_bars(frame, START + hours(5), START + hours(55))
+
+
+def test_single_range_files_are_still_read(tmp_path):
+    algorithm = FakeAlgorithm()
+    cache = HistoryCache(str(tmp_path))
+    times = pd.date_range(START, START + hours(10), freq='h')
+    np.savez_compressed(cache._path('BTCUSD', 'Hour'),
+                        __range__=np.array([times[0].value, times[-1].value], dtype=np.int64),
+                        __time__=nanoseconds(times),
+                        col_close=close_at(times))
+
+    frame = cache.history(algorithm, 'BTCUSD', START + hours(2), START + hours(8), 'Hour')
+    assert algorithm.requests == []
+    assert_bars(frame, START + hours(2), START + hours(8))
+
+
+class FakeSymbol:
+    """Like a LEAN Symbol, str() is only the ticker while ID also encodes the market"""
+
+    def __init__(self, ticker, market):
+        self.ticker = ticker
+        self.ID = f"{ticker} {market}"
+
+    def __str__(self):
+        return self.ticker
+
+
+def test_symbols_do_not_share_files(tmp_path):
+    algorithm = FakeAlgorithm()
+    cache = HistoryCache(str(tmp_path))
+    for symbol in (FakeSymbol('BTCUSD', 'coinbase'), FakeSymbol('BTCUSD', 'bitfinex'), 'ETHUSD'):
+        cache.history(algorithm, symbol, START, START + hours(10), 'Hour')
+    cache.history(algorithm, 'ETHUSD', START, START + hours(10), 'Daily')
+    assert len(algorithm.requests) == 4
+    assert len(os.listdir(tmp_path)) == 4
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    algorithm = FakeAlgorithm()
+    cache = HistoryCache(str(tmp_path))
+    for age, symbol in enumerate(('A', 'B', 'C')):
+        cache.history(algorithm, symbol, START, START + hours(100), 'Hour')
+        # Make the access order explicit instead of relying on mtime resolution
+        stamp = 1_000_000 + age
+        os.utime(cache._path(symbol, 'Hour'), (stamp, stamp))
+    size = os.path.getsize(cache._path('A', 'Hour'))
+
+    # Reading A makes B the least recently used file
+    cache.history(algorithm, 'A', START, START + hours(100), 'Hour')
+    cache.max_bytes = int(3.5 * size)
+    cache.history(algorithm, 'D', START, START + hours(100), 'Hour')
+
+    remaining = set(os.listdir(tmp_path))
+    assert os.path.basename(cache._path('B', 'Hour')) not in remaining
+    assert {os.path.basename(cache._path(symbol, 'Hour')) for symbol in 'ACD'} <= remaining
+    assert not [name for name in remaining if not name.endswith('.npz')]
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from models.aplha_models.insight_coalescer import InsightCoalescer
+
+START = datetime(2024, 1, 1)
+
+
+def make_coalescer():
+    coalescer = InsightCoalescer(period=timedelta(days=1), refresh_before=timedelta(hours=1),
+                                 magnitude_tolerance=0.005, confidence_tolerance=0.1)
+    coalescer.replace('BTC', START, 1, 0.02, 0.6, insight='first')
+    return coalescer
+
+
+def test_new_symbols_are_emitted():
+    assert make_coalescer().should_emit('ETH', START, 1, 0.02, 0.6)
+
+
+def test_unchanged_signal_is_suppressed():
+    assert not make_coalescer().should_emit('BTC', START + timedelta(hours=3), 1, 0.02, 0.6)
+
+
+def test_direction_flip_is_emitted():
+    assert make_coalescer().should_emit('BTC', START + timedelta(hours=3), -1, 0.02, 0.6)
+
+
+def test_magnitude_and_confidence_tolerances():
+    coalescer = make_coalescer()
+    time = START + timedelta(hours=3)
+    assert not coalescer.should_emit('BTC', time, 1, 0.024, 0.6)
+    assert coalescer.should_emit('BTC', time, 1, 0.026, 0.6)
+    assert not coalescer.should_emit('BTC', time, 1, 0.02, 0.65)
+    assert coalescer.should_emit('BTC', time, 1, 0.02, 0.75)
+
+
+def test_refresh_near_expiry():
+    coalescer = make_coalescer()
+    assert not coalescer.should_emit('BTC', START + timedelta(hours=22, minutes=59), 1, 0.02, 0.6)
+    assert coalescer.should_emit('BTC', START + timedelta(hours=23), 1, 0.02, 0.6)
+    assert coalescer.should_emit('BTC', START + timedelta(days=2), 1, 0.02, 0.6)
+
+
+def test_replace_returns_the_previous_insight_while_it_is_active():
+    coalescer = make_coalescer()
+    assert coalescer.replace('BTC', START + timedelta(hours=5), -1, 0.02, 0.6, insight='second') == 'first'
+    assert coalescer.active['BTC'].expiry == START + timedelta(hours=29)
+    # The second insight has expired by now, so there is nothing left to cancel
+    assert coalescer.replace('BTC', START + timedelta(hours=29), 1, 0.02, 0.6, insight='third') is None
+    assert coalescer.active['BTC'].insight == 'third'
+
+
+def test_removed_symbols_start_over():
+    coalescer = make_coalescer()
+    coalescer.remove('BTC')
+    assert coalescer.should_emit('BTC', START + timedelta(hours=3), 1, 0.02, 0.6)
+    assert coalescer.replace('BTC', START + timedelta(hours=3), 1, 0.02, 0.6) is None
@@ -0,0 +1,17 @@
+from offline import run_sharded
+
+
+def indicator_state(strength):
+    return {symbol: {name: vars(stats) for name, stats in indicators.items()}
+            for symbol, indicators in strength.asset_indicators.items()}
+
+
+def test_result_does_not_depend_on_worker_count(make_bars):
+    bars = make_bars()
+    single = run_sharded(bars, workers=1)
+    sharded = run_sharded(bars, workers=3)
+
+    assert single.insights
+    assert sharded.insights == single.insights
+    assert sharded.indicator_strength.signals == single.indicator_strength.signals
+    assert indicator_state(sharded.indicator_strength) == indicator_state(single.indicator_strength)
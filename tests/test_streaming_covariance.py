@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from models.portfolio_construction.streaming_covariance import StreamingCovariance
+
+START = datetime(2024, 1, 1)
+
+
+def correlated_prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    factor = np.linalg.cholesky([[1.0, 0.6, 0.2], [0.6, 1.0, 0.3], [0.2, 0.3, 1.0]])
+    returns = (rng.normal(size=(n, 3)) @ factor.T) * [0.01, 0.02, 0.015]
+    return 100 * np.exp(np.vstack([np.zeros(3), np.cumsum(returns, axis=0)]))
+
+
+def feed(estimator, symbols, prices, offset=0):
+    for i, row in enumerate(prices):
+        for symbol, price in zip(symbols, row):
+            estimator.update_price(symbol, START + timedelta(hours=offset + i), price)
+
+
+def test_covariance_matches_pandas_ewm():
+    prices = correlated_prices(2000)
+    estimator = StreamingCovariance(halflife=48)
+    for symbol in 'abc':
+        estimator.add_symbol(symbol)
+    feed(estimator, 'abc', prices)
+
+    # Returns of a bar end time are applied once a later bar arrives, so the last one is still pending
+    returns = pd.DataFrame(np.diff(np.log(prices), axis=0)[:-1])
+    expected = returns.ewm(halflife=48, adjust=False).cov(bias=True).iloc[-3:].to_numpy()
+    np.testing.assert_allclose(estimator.covariance(list('abc')), expected, rtol=1e-9)
+
+
+def test_removed_slots_are_reused_and_reset():
+    prices = correlated_prices(100)
+    estimator = StreamingCovariance(halflife=24, min_periods=24)
+    estimator.add_symbol('a')
+    estimator.add_symbol('b')
+    feed(estimator, 'ab', prices[:, :2])
+    slot = estimator.slots['a']
+    variance_b = estimator.covariance(['b'])[0, 0]
+
+    estimator.remove_symbol('a')
+    estimator.add_symbol('c')
+    assert estimator.slots['c'] == slot
+    assert estimator.counts[slot] == 0
+    assert not estimator.is_ready('c')
+    assert estimator.covariance(['c', 'b'])[0].tolist() == [0.0, 0.0]
+    assert estimator.covariance(['b'])[0, 0] == variance_b
+    assert estimator.is_ready('b')
+
+
+def test_not_ready_symbols_get_median_volatility_and_no_crowding():
+    prices = correlated_prices(100)
+    estimator = StreamingCovariance(halflife=24, min_periods=24)
+    for symbol in 'abc':
+        estimator.add_symbol(symbol)
+    feed(estimator, 'abc', prices)
+    estimator.add_symbol('new')
+    feed(estimator, ['new'], prices[:5, :1], offset=len(prices))
+
+    convictions = {'a': 1.0, 'b': -2.0, 'c': 0.5, 'new': -1.0}
+    adjusted = estimator.risk_adjusted_convictions(convictions)
+
+    cov = estimator.covariance(list('abc'))
+    vol = np.sqrt(np.diag(cov))
+    crowding = np.abs(cov / np.outer(vol, vol)).sum(axis=1)
+    for i, symbol in enumerate('abc'):
+        assert np.isclose(adjusted[symbol], convictions[symbol] / (vol[i] * crowding[i]))
+    assert np.isclose(adjusted['new'], -1.0 / np.median(vol))
+    assert all(np.sign(adjusted[symbol]) == np.sign(value) for symbol, value in convictions.items())
+
+
+def test_convictions_unchanged_while_no_symbol_is_ready():
+    estimator = StreamingCovariance(min_periods=24)
+    estimator.add_symbol('a')
+    feed(estimator, ['a'], correlated_prices(5)[:, :1])
+    assert estimator.risk_adjusted_convictions({'a': 0.3}) == {'a': 0.3}
@@ -0,0 +1,21 @@
+from models.symbol_registry import SymbolRegistry
+
+
+def test_ids_are_dense_and_stable():
+    registry = SymbolRegistry()
+    assert [registry.acquire(symbol) for symbol in ('BTCUSD', 'ETHUSD', 'BTCUSD')] == [0, 1, 0]
+    assert registry.capacity == 2
+    assert registry.id_of('ETHUSD') == 1
+    assert registry.id_of('SOLUSD') is None
+    assert registry.symbol_of(0) == 'BTCUSD'
+    # A coin re-entering the universe gets its old id back, so state keyed by it stays valid
+    assert registry.acquire('ETHUSD') == 1
+
+
+def test_default_registry_is_per_algorithm():
+    class Algorithm:
+        pass
+
+    first, second = Algorithm(), Algorithm()
+    assert SymbolRegistry.default(first) is SymbolRegistry.default(first)
+    assert SymbolRegistry.default(first) is not SymbolRegistry.default(second)
@@ -0,0 +1,42 @@
+from models.portfolio_construction.tolerance_band_rebalancer import ToleranceBandRebalancer
+
+
+def test_entries_below_the_drift_band_are_bought():
+    rebalancer = ToleranceBandRebalancer(drift_band=0.02, min_notional=10)
+    targets = {f"COIN{i}": 0.5 / 30 for i in range(30)}
+    assert sorted(rebalancer.rebalance(targets, {}, 10_000)) == sorted(targets.items())
+
+
+def test_entries_below_the_minimum_notional_are_skipped():
+    rebalancer = ToleranceBandRebalancer(drift_band=0.02, min_notional=10)
+    assert rebalancer.rebalance({'BTC': 0.005}, {}, 1_000) == []
+
+
+def test_liquidations_ignore_the_minimum_notional():
+    rebalancer = ToleranceBandRebalancer(drift_band=0.02, min_notional=10)
+    assert rebalancer.rebalance({}, {'BTC': 0.001}, 1_000) == [('BTC', 0.0)]
+
+
+def test_adjustments_only_outside_the_band():
+    rebalancer = ToleranceBandRebalancer(drift_band=0.02, min_notional=10)
+    current = {'BTC': 0.20, 'ETH': 0.20, 'SOL': 0.20}
+    targets = {'BTC': 0.21, 'ETH': 0.25, 'SOL': 0.15}
+    assert rebalancer.rebalance(targets, current, 10_000) == [('ETH', 0.25), ('SOL', 0.15)]
+
+
+def test_adjustments_below_the_minimum_notional_are_skipped():
+    rebalancer = ToleranceBandRebalancer(drift_band=0.02, min_notional=100)
+    assert rebalancer.rebalance({'BTC': 0.25}, {'BTC': 0.20}, 1_000) == []
+
+
+def test_liquidations_come_before_entries_and_adjustments():
+    rebalancer = ToleranceBandRebalancer(drift_band=0.02, min_notional=10)
+    targets = {'NEW': 0.1, 'BTC': 0.4}
+    current = {'BTC': 0.2, 'OLD': 0.3, 'GONE': 0.1}
+    result = rebalancer.rebalance(targets, current, 10_000)
+    assert result[:2] == [('OLD', 0.0), ('GONE', 0.0)]
+    assert sorted(result[2:]) == [('BTC', 0.4), ('NEW', 0.1)]
+
+
+def test_nothing_to_do():
+    assert ToleranceBandRebalancer().rebalance({}, {}, 10_000) == []